@@ -1,41 +1,116 @@
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 from app.core.config import settings
-from app.ai.retriever import get_retriever
+from app.ai.retriever import RetrievalContext, build_retrieval_context, abuild_retrieval_context
 from app.ai.llm_factory import get_llm
 from app.ai.prompts import COVER_LETTER_PROMPT, RECRUITER_EMAIL_PROMPT  # Import prompts
+from app.ai.response_cache import get_response_cache
+from app.core.concurrency import run_blocking
+from typing import AsyncIterator, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 def get_rag_context(resume_k=4, job_k=4):
-    resume_docs = get_retriever(index_name="resume", k=resume_k).get_relevant_documents("summarize my fit")
-    job_docs = get_retriever(index_name="job", k=job_k).get_relevant_documents("summarize requirements")
-    
-    resume_context = "\n".join([d.page_content for d in resume_docs])
-    job_context = "\n".join([d.page_content for d in job_docs])
-    
-    # Log the retrieved contexts for debugging
-    logger.info(f"Retrieved {len(resume_docs)} resume chunks and {len(job_docs)} job chunks")
-    if job_docs:
-        logger.info(f"Job context preview: {job_context[:200]}...")
-    else:
-        logger.warning("No job description chunks retrieved!")
-    
-    return resume_context, job_context
+    context = build_retrieval_context(resume_k=resume_k, job_k=job_k)
+    return context.resume_context, context.job_context
 
-def generate_cover_letter(role: str, company: str):
-    resume_context, job_context = get_rag_context()
-    
-    prompt = PromptTemplate.from_template(COVER_LETTER_PROMPT)  # Use imported prompt
-    llm = get_llm(temperature=0.7)
-    chain = LLMChain(prompt=prompt, llm=llm)
-    return chain.run(role=role, company=company, resume_context=resume_context, job_context=job_context)
+async def aget_rag_context(resume_k=4, job_k=4):
+    """Async variant of get_rag_context; both retrievals run concurrently off the event loop."""
+    context = await abuild_retrieval_context(resume_k=resume_k, job_k=job_k)
+    return context.resume_context, context.job_context
+
+def _prompt_inputs(role: str, company: str, context: RetrievalContext) -> dict:
+    return {
+        "role": role,
+        "company": company,
+        "resume_context": context.resume_context,
+        "job_context": context.job_context,
+    }
+
+def _cached_response(template: str, role: str, company: str, context: RetrievalContext,
+                     force_regenerate: bool) -> Optional[str]:
+    cache = get_response_cache()
+    if cache is None:
+        return None
+    if force_regenerate:
+        cache.record_bypass()
+        return None
+    return cache.get(template, role, company, context.resume_context, context.job_context)
+
+def _store_response(template: str, role: str, company: str, context: RetrievalContext, response: str):
+    cache = get_response_cache()
+    if cache is not None and response:
+        cache.put(template, role, company, context.resume_context, context.job_context, response)
 
-def generate_recruiter_email(role: str, company: str):
-    resume_context, job_context = get_rag_context()
+def _build_chain(template: str):
+    return PromptTemplate.from_template(template) | get_llm(temperature=0.7) | StrOutputParser()
+
+async def _arun_prompt(template: str, role: str, company: str, context: Optional[RetrievalContext] = None,
+                       force_regenerate: bool = False) -> str:
+    if context is None:
+        context = await abuild_retrieval_context()
+    # Semantic lookups embed the query, so keep cache access off the event loop
+    cached = await run_blocking(_cached_response, template, role, company, context, force_regenerate)
+    if cached is not None:
+        return cached
+    response = await _build_chain(template).ainvoke(_prompt_inputs(role, company, context))
+    await run_blocking(_store_response, template, role, company, context, response)
+    return response
+
+async def _astream_prompt(template: str, role: str, company: str, context: Optional[RetrievalContext] = None,
+                          force_regenerate: bool = False) -> AsyncIterator[str]:
+    if context is None:
+        context = await abuild_retrieval_context()
+    # Semantic lookups embed the query, so keep cache access off the event loop
+    cached = await run_blocking(_cached_response, template, role, company, context, force_regenerate)
+    if cached is not None:
+        yield cached
+        return
+    chunks = []
+    async for token in _build_chain(template).astream(_prompt_inputs(role, company, context)):
+        chunks.append(token)
+        yield token
+    await run_blocking(_store_response, template, role, company, context, "".join(chunks))
+
+def _run_prompt(template: str, role: str, company: str, context: Optional[RetrievalContext] = None,
+                force_regenerate: bool = False) -> str:
+    if context is None:
+        context = build_retrieval_context()
+    cached = _cached_response(template, role, company, context, force_regenerate)
+    if cached is not None:
+        return cached
     
-    prompt = PromptTemplate.from_template(RECRUITER_EMAIL_PROMPT)  # Use imported prompt
+    prompt = PromptTemplate.from_template(template)  # Use imported prompt
     llm = get_llm(temperature=0.7)
     chain = LLMChain(prompt=prompt, llm=llm)
-    return chain.run(role=role, company=company, resume_context=resume_context, job_context=job_context)
+    response = chain.run(**_prompt_inputs(role, company, context))
+    _store_response(template, role, company, context, response)
+    return response
+
+def generate_cover_letter(role: str, company: str, context: Optional[RetrievalContext] = None,
+                          force_regenerate: bool = False):
+    return _run_prompt(COVER_LETTER_PROMPT, role, company, context, force_regenerate)
+
+def generate_recruiter_email(role: str, company: str, context: Optional[RetrievalContext] = None,
+                             force_regenerate: bool = False):
+    return _run_prompt(RECRUITER_EMAIL_PROMPT, role, company, context, force_regenerate)
+
+async def agenerate_cover_letter(role: str, company: str, context: Optional[RetrievalContext] = None,
+                                 force_regenerate: bool = False) -> str:
+    return await _arun_prompt(COVER_LETTER_PROMPT, role, company, context, force_regenerate)
+
+async def agenerate_recruiter_email(role: str, company: str, context: Optional[RetrievalContext] = None,
+                                    force_regenerate: bool = False) -> str:
+    return await _arun_prompt(RECRUITER_EMAIL_PROMPT, role, company, context, force_regenerate)
+
+def astream_cover_letter(role: str, company: str, context: Optional[RetrievalContext] = None,
+                         force_regenerate: bool = False) -> AsyncIterator[str]:
+    """Yield cover letter tokens as the LLM produces them (a cached letter arrives as one chunk)."""
+    return _astream_prompt(COVER_LETTER_PROMPT, role, company, context, force_regenerate)
+
+def astream_recruiter_email(role: str, company: str, context: Optional[RetrievalContext] = None,
+                            force_regenerate: bool = False) -> AsyncIterator[str]:
+    """Yield recruiter email tokens as the LLM produces them (a cached email arrives as one chunk)."""
+    return _astream_prompt(RECRUITER_EMAIL_PROMPT, role, company, context, force_regenerate)
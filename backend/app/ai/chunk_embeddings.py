@@ -0,0 +1,78 @@
+import hashlib
+from typing import List, Optional, Tuple
+import numpy as np
+from app.ai.embedding_engine import get_embedding_engine
+from app.core.config import settings
+from app.persistence.chunk_store import get_chunk_store
+import logging
+
+logger = logging.getLogger(__name__)
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def embed_chunks(chunks: List[str], model_name: Optional[str] = None) -> Tuple[np.ndarray, dict]:
+    """
+    Embed ``chunks``, reusing vectors previously computed for identical text.
+
+    Returns the (n, dim) float32 matrix in input order and a report with
+    how many chunks were reused from the store vs. sent to the model.
+    """
+    model_name = model_name or settings.EMBEDDING_MODEL
+    store = get_chunk_store(model_name)
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+    found = store.lookup(hashes)
+
+    # Embed each unseen text once, even if it repeats within this upload
+    missing = {}
+    for h, chunk in zip(hashes, chunks):
+        if h not in found and h not in missing:
+            missing[h] = chunk
+    if missing:
+        new_vectors = get_embedding_engine(model_name).encode(list(missing.values()))
+        store.add(list(missing.keys()), new_vectors)
+        found.update(zip(missing.keys(), new_vectors))
+
+    vectors = np.vstack([found[h] for h in hashes]) if hashes else np.zeros((0, 0), dtype=np.float32)
+    report = {
+        "chunks_reused": len(chunks) - sum(1 for h in hashes if h in missing),
+        "chunks_embedded": len(missing),
+    }
+    logger.info(f"Chunk embeddings: {report['chunks_reused']} reused, {report['chunks_embedded']} computed")
+    return vectors, report
+
+def lookup_chunk_vectors(chunks: List[str], model_name: Optional[str] = None) -> np.ndarray:
+    """
+    Vectors for ``chunks`` in input order, without writing to the chunk store.
+
+    Ingested chunks are read from the store; any others are encoded on the
+    spot and not persisted, so request paths never append to the store.
+    """
+    model_name = model_name or settings.EMBEDDING_MODEL
+    hashes = [chunk_hash(chunk) for chunk in chunks]
+    found = get_chunk_store(model_name).lookup(hashes)
+    missing = {}
+    for h, chunk in zip(hashes, chunks):
+        if h not in found:
+            missing.setdefault(h, chunk)
+    if missing:
+        found.update(zip(missing.keys(), get_embedding_engine(model_name).encode(list(missing.values()))))
+    return np.vstack([found[h] for h in hashes]) if hashes else np.zeros((0, 0), dtype=np.float32)
+
+def add_chunks(vectorstore, chunks: List[str], metadatas: Optional[List[dict]] = None,
+               ids: Optional[List[str]] = None) -> dict:
+    """
+    Add ``chunks`` to ``vectorstore`` using cached embeddings where possible.
+
+    Stores without ``add_embeddings`` (e.g. Pinecone) fall back to
+    ``add_texts`` and embed every chunk.
+    """
+    if not chunks:
+        return {"chunks_reused": 0, "chunks_embedded": 0}
+    if not hasattr(vectorstore, "add_embeddings"):
+        vectorstore.add_texts(chunks, metadatas=metadatas, ids=ids)
+        return {"chunks_reused": 0, "chunks_embedded": len(chunks)}
+
+    vectors, report = embed_chunks(chunks)
+    vectorstore.add_embeddings(list(zip(chunks, vectors.tolist())), metadatas=metadatas, ids=ids)
+    return report
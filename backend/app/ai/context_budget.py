@@ -0,0 +1,137 @@
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+from langchain.schema import Document
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+def get_tokenizer():
+    """Fast Hugging Face tokenizer used to measure prompt sections (CONTEXT_TOKENIZER, else the embedding model's)."""
+    global _tokenizer
+    with _tokenizer_lock:
+        if _tokenizer is None:
+            from transformers import AutoTokenizer
+            _tokenizer = AutoTokenizer.from_pretrained(settings.CONTEXT_TOKENIZER or settings.EMBEDDING_MODEL,
+                                                       use_fast=True)
+            # We only count and cut text, never feed it to the model, so lift the length limit warning
+            _tokenizer.model_max_length = int(1e9)
+        return _tokenizer
+
+def _token_offsets(text: str) -> List[Tuple[int, int]]:
+    return get_tokenizer()(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+
+def count_tokens(text: str) -> int:
+    return len(_token_offsets(text))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` at a token boundary so it holds at most ``max_tokens`` tokens."""
+    offsets = _token_offsets(text)
+    if len(offsets) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    return text[:offsets[max_tokens - 1][1]]
+
+def _overlap(previous: str, text: str, max_overlap: int) -> int:
+    """Length of the longest suffix of ``previous`` that ``text`` starts with (chunk-splitter overlap)."""
+    for size in range(min(len(previous), len(text), max_overlap), 20, -1):
+        if previous.endswith(text[:size]):
+            return size
+    return 0
+
+def _unique(docs: List[Document]) -> List[Document]:
+    """Drop duplicate chunks and chunks contained in another, longest first."""
+    # Longest first, so a chunk contained in another is seen after its container
+    docs = sorted(docs, key=lambda doc: len(doc.page_content), reverse=True)
+    kept: List[Document] = []
+    seen = set()
+    for doc in docs:
+        text = " ".join(doc.page_content.split())
+        digest = hashlib.sha1(text.lower().encode("utf-8")).hexdigest()
+        if not text or digest in seen or any(text in " ".join(k.page_content.split()) for k in kept):
+            continue
+        seen.add(digest)
+        kept.append(doc)
+    return kept
+
+def _trim_overlap(kept: List[Document], max_overlap: int = 200) -> List[Document]:
+    trimmed = []
+    for doc in kept:
+        text = doc.page_content
+        for other in kept:
+            if other is doc:
+                continue
+            size = _overlap(other.page_content, text, max_overlap)
+            if size:
+                text = text[size:].lstrip()
+                break
+        trimmed.append(Document(page_content=text, metadata=doc.metadata))
+    return trimmed
+
+def deduplicate(docs: List[Document], max_overlap: int = 200) -> List[Document]:
+    """
+    Drop duplicate chunks and chunks contained in another, and trim the text a
+    chunk shares with its neighbour from the splitter's chunk overlap.
+    """
+    return _trim_overlap(_unique(docs), max_overlap)
+
+def mmr_order(query_vector: np.ndarray, doc_vectors: np.ndarray, lambda_mult: float) -> List[int]:
+    """Indices of ``doc_vectors`` in maximal-marginal-relevance order (vectors are normalized)."""
+    relevance = doc_vectors @ query_vector
+    similarity = doc_vectors @ doc_vectors.T
+    order: List[int] = []
+    remaining = list(range(len(doc_vectors)))
+    while remaining:
+        if order:
+            redundancy = similarity[np.ix_(remaining, order)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(remaining))
+        scores = lambda_mult * relevance[remaining] - (1 - lambda_mult) * redundancy
+        order.append(remaining.pop(int(np.argmax(scores))))
+    return order
+
+def budget_documents(query: str, docs: List[Document], max_tokens: int, max_docs: Optional[int] = None,
+                     lambda_mult: Optional[float] = None) -> List[Document]:
+    """
+    Assemble one prompt section from retrieved chunks.
+
+    Chunks are deduplicated, ranked by MMR against ``query`` and added until
+    ``max_tokens`` (counted with a real tokenizer) is reached; the chunk that
+    crosses the budget is truncated at a token boundary.
+    """
+    from app.ai.chunk_embeddings import lookup_chunk_vectors
+    from app.ai.embeddings import get_embeddings
+
+    originals = _unique(docs)
+    if not originals:
+        return []
+    docs = _trim_overlap(originals)
+    lambda_mult = settings.CONTEXT_MMR_LAMBDA if lambda_mult is None else lambda_mult
+    # Look up by the text as ingested (before overlap trimming), so this is a read-only chunk-store hit
+    doc_vectors = lookup_chunk_vectors([doc.page_content for doc in originals])
+    query_vector = np.asarray(get_embeddings().embed_query(query), dtype=np.float32)
+
+    selected: List[Document] = []
+    used = 0
+    for index in mmr_order(query_vector, doc_vectors, lambda_mult):
+        if max_docs is not None and len(selected) >= max_docs:
+            break
+        doc = docs[index]
+        tokens = count_tokens(doc.page_content)
+        if used + tokens > max_tokens:
+            remaining = max_tokens - used
+            if remaining >= settings.CONTEXT_MIN_CHUNK_TOKENS:
+                selected.append(Document(page_content=truncate_to_tokens(doc.page_content, remaining),
+                                         metadata=doc.metadata))
+                used = max_tokens
+            break
+        selected.append(doc)
+        used += tokens
+    logger.info(f"Context budget: kept {len(selected)} of {len(docs)} chunks, {used}/{max_tokens} tokens")
+    return selected
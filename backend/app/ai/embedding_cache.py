@@ -0,0 +1,119 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace so trivially different queries share a cache entry."""
+    return re.sub(r"\s+", " ", text).strip()
+
+class QueryEmbeddingCache:
+    """
+    LRU cache of query vectors keyed by model name + normalized text.
+
+    An optional Redis tier (EMBEDDING_CACHE_REDIS) shares vectors between
+    workers; Redis errors are logged and treated as misses.
+    """
+
+    def __init__(self, model_name: str, max_size: int):
+        self.model_name = model_name
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self.stats = {"hits": 0, "redis_hits": 0, "misses": 0}
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha1(normalize_query(text).encode("utf-8")).hexdigest()
+        return f"emb:{self.model_name}:{digest}"
+
+    def _get_redis(self):
+        if self._redis is None and settings.EMBEDDING_CACHE_REDIS:
+            from app.persistence.redis_client import get_redis_connection
+            self._redis = get_redis_connection()
+        return self._redis
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = self._key(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return list(vector)
+
+        vector = self._get_from_redis(key)
+        if vector is not None:
+            self._put_local(key, vector)
+            with self._lock:
+                self.stats["redis_hits"] += 1
+            return list(vector)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, text: str, vector: List[float]):
+        key = self._key(text)
+        self._put_local(key, vector)
+        redis_conn = self._get_redis()
+        if redis_conn is not None:
+            try:
+                payload = np.asarray(vector, dtype=np.float32).tobytes()
+                redis_conn.set(key, payload, ex=settings.EMBEDDING_CACHE_TTL_SECONDS)
+            except Exception as e:
+                logger.warning(f"Failed to write embedding to Redis cache: {e}")
+
+    def _put_local(self, key: str, vector: List[float]):
+        with self._lock:
+            self._entries[key] = list(vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_from_redis(self, key: str) -> Optional[List[float]]:
+        redis_conn = self._get_redis()
+        if redis_conn is None:
+            return None
+        try:
+            payload = redis_conn.get(key)
+        except Exception as e:
+            logger.warning(f"Failed to read embedding from Redis cache: {e}")
+            return None
+        if payload is None:
+            return None
+        return np.frombuffer(payload, dtype=np.float32).tolist()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["redis_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "capacity": self.max_size,
+                "hit_rate": round((lookups - self.stats["misses"]) / lookups, 3) if lookups else 0.0,
+            }
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves embed_query from a QueryEmbeddingCache."""
+
+    def __init__(self, embeddings: Embeddings, cache: QueryEmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text)
+        if vector is None:
+            vector = self.embeddings.embed_query(normalize_query(text))
+            self.cache.put(text, vector)
+        return vector
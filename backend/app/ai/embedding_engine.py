@@ -0,0 +1,94 @@
+import atexit
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from app.ai.embeddings import get_base_embeddings
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingEngine:
+    """
+    Batch encoder for bulk ingestion.
+
+    Texts are sorted by length so each batch pads to a similar size, encoded
+    in ``batch_size`` batches, and returned in the caller's order. With
+    ``workers > 1`` batches are spread over a sentence-transformers
+    multi-process pool, one CPU process per worker.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: Optional[int] = None,
+                 workers: Optional[int] = None):
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.workers = workers or settings.EMBEDDING_WORKERS
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The underlying SentenceTransformer shared with the embedding registry."""
+        return get_base_embeddings(self.model_name).client
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                logger.info(f"Starting embedding pool with {self.workers} worker processes")
+                self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+            return self._pool
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self.model.stop_multi_process_pool(self._pool)
+                self._pool = None
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode ``texts`` into an (n, dim) float32 matrix of normalized vectors."""
+        if not texts:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # Longest first: batches hold similar lengths and padding waste stays low
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        sorted_texts = [texts[i] for i in order]
+
+        if self.workers > 1 and len(texts) > self.batch_size:
+            vectors = self.model.encode_multi_process(
+                sorted_texts,
+                self._get_pool(),
+                batch_size=self.batch_size,
+                chunk_size=self.batch_size * 4,
+                normalize_embeddings=True,
+            )
+        else:
+            vectors = self.model.encode(
+                sorted_texts,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+
+        result = np.empty_like(vectors, dtype=np.float32)
+        result[order] = vectors
+        return result
+
+_engines: Dict[str, EmbeddingEngine] = {}
+_engines_lock = threading.Lock()
+
+def get_embedding_engine(model_name: Optional[str] = None) -> EmbeddingEngine:
+    """Return the process-wide engine for ``model_name`` configured from settings."""
+    model_name = model_name or settings.EMBEDDING_MODEL
+    with _engines_lock:
+        engine = _engines.get(model_name)
+        if engine is None:
+            engine = EmbeddingEngine(model_name)
+            _engines[model_name] = engine
+        return engine
+
+def _close_engines():
+    for engine in _engines.values():
+        engine.close()
+
+atexit.register(_close_engines)
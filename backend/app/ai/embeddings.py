@@ -1,10 +1,98 @@
 # from langchain.embeddings import HuggingFaceEmbeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
 from app.core.config import settings
+from app.ai.embedding_cache import QueryEmbeddingCache, CachedEmbeddings
+from typing import Dict, Optional
+import threading
+import time
+import logging
 
-def get_embeddings():
-    return HuggingFaceEmbeddings(
-        model_name=settings.EMBEDDING_MODEL,
-        model_kwargs={'device': 'cpu'},  # Use 'cuda' if you have GPU
+logger = logging.getLogger(__name__)
+
+# Loaded models are shared by every request in this worker, keyed by model name
+_registry: Dict[str, HuggingFaceEmbeddings] = {}
+_cached: Dict[str, CachedEmbeddings] = {}
+_load_stats: Dict[str, dict] = {}
+_registry_lock = threading.Lock()
+_stats_lock = threading.Lock()  # request counters are bumped from every request thread
+
+def _model_memory_bytes(embeddings: HuggingFaceEmbeddings) -> int:
+    """Approximate the in-memory size of the model weights."""
+    try:
+        client = embeddings.client
+        total = sum(p.numel() * p.element_size() for p in client.parameters())
+        total += sum(b.numel() * b.element_size() for b in client.buffers())
+        return total
+    except Exception:
+        return 0
+
+def _load_embeddings(model_name: str) -> HuggingFaceEmbeddings:
+    start = time.perf_counter()
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={'device': settings.EMBEDDING_DEVICE},  # Use 'cuda' if you have GPU
         encode_kwargs={'normalize_embeddings': True}
     )
+    load_seconds = time.perf_counter() - start
+    _load_stats[model_name] = {
+        "load_seconds": round(load_seconds, 3),
+        "memory_bytes": _model_memory_bytes(embeddings),
+        "device": settings.EMBEDDING_DEVICE,
+        "loaded_at": time.time(),
+        "requests": 0,
+    }
+    logger.info(f"Loaded embedding model {model_name} in {load_seconds:.2f}s")
+    return embeddings
+
+def get_base_embeddings(model_name: Optional[str] = None) -> HuggingFaceEmbeddings:
+    """
+    Return the process-wide embedding model, loading it on first use.
+
+    The model is loaded once per worker and shared across threads;
+    concurrent first calls block on the lock instead of loading twice.
+    """
+    model_name = model_name or settings.EMBEDDING_MODEL
+    embeddings = _registry.get(model_name)
+    if embeddings is None:
+        with _registry_lock:
+            embeddings = _registry.get(model_name)
+            if embeddings is None:
+                embeddings = _load_embeddings(model_name)
+                _registry[model_name] = embeddings
+    with _stats_lock:
+        _load_stats[model_name]["requests"] += 1
+    return embeddings
+
+def get_embeddings(model_name: Optional[str] = None) -> Embeddings:
+    """Return the shared embedding model, with query embeddings cached when enabled."""
+    model_name = model_name or settings.EMBEDDING_MODEL
+    embeddings = get_base_embeddings(model_name)
+    if settings.EMBEDDING_CACHE_SIZE <= 0:
+        return embeddings
+    cached = _cached.get(model_name)
+    if cached is None:
+        with _registry_lock:
+            cached = _cached.get(model_name)
+            if cached is None:
+                cached = CachedEmbeddings(embeddings, QueryEmbeddingCache(model_name, settings.EMBEDDING_CACHE_SIZE))
+                _cached[model_name] = cached
+    return cached
+
+def warm_up_embeddings(model_name: Optional[str] = None) -> dict:
+    """Load the model and run one encode so the first request pays no cold-start cost."""
+    model_name = model_name or settings.EMBEDDING_MODEL
+    embeddings = get_base_embeddings(model_name)
+    start = time.perf_counter()
+    embeddings.embed_query("warm up")
+    with _stats_lock:
+        _load_stats[model_name]["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    return get_embedding_stats()[model_name]
+
+def get_embedding_stats() -> Dict[str, dict]:
+    """Load time, memory footprint, usage counts and query cache stats for every loaded model."""
+    with _stats_lock:
+        stats = {name: dict(model_stats) for name, model_stats in _load_stats.items()}
+    for name, cached in _cached.items():
+        stats[name]["query_cache"] = cached.cache.get_stats()
+    return stats
@@ -0,0 +1,52 @@
+import hashlib
+from typing import Any, Dict, List, Sequence
+from langchain.schema import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from app.core.config import settings
+from app.persistence.keyword_index import backfill_from_faiss, get_keyword_index
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _doc_key(doc: Document) -> str:
+    return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+def reciprocal_rank_fusion(rankings: Sequence[List[Document]], k: int, rrf_k: int = 60) -> List[Document]:
+    """Merge ranked lists by summing 1 / (rrf_k + rank); a chunk found by several rankers rises to the top."""
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = _doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            docs.setdefault(key, doc)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[key] for key in best]
+
+class HybridRetriever(BaseRetriever):
+    """
+    Dense similarity search fused with BM25 keyword search over the same chunks.
+
+    Dense search finds paraphrases; BM25 catches exact skill names
+    ("Kubernetes", "PySpark") that embeddings blur. Each side returns
+    HYBRID_FETCH_K candidates and the lists are merged with reciprocal rank
+    fusion, so no score calibration between the two is needed.
+    """
+
+    vectorstore: Any
+    index_name: str
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        fetch_k = max(self.k, settings.HYBRID_FETCH_K)
+        dense = self.vectorstore.similarity_search(query, k=fetch_k)
+        try:
+            keyword_index = get_keyword_index(self.index_name)
+            if not keyword_index.exists and hasattr(self.vectorstore, "docstore"):
+                backfill_from_faiss(keyword_index, self.vectorstore)
+            sparse = [doc for doc, _ in keyword_index.search(query, k=fetch_k)]
+        except Exception as e:
+            logger.warning(f"Keyword search failed for {self.index_name}, using dense results only: {str(e)}")
+            return dense[:self.k]
+        return reciprocal_rank_fusion([dense, sparse], self.k, settings.HYBRID_RRF_K)
@@ -1,24 +1,393 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import httpx
+import numpy as np
+import openai
 from langchain_community.llms import OpenAI
+from langchain_core.language_models import LLM, BaseChatModel, BaseLLM, SimpleChatModel
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_perplexity import ChatPerplexity
 from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+
+class _PoolStats:
+    """Counts requests and newly opened connections for one provider's HTTP pool."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def _on_trace(self, event_name: str):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+
+    def sync_hook(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = lambda event_name, info: self._on_trace(event_name)
+
+    async def async_hook(self, request: httpx.Request):
+        with self._lock:
+            self.requests += 1
+
+        async def trace(event_name, info):
+            self._on_trace(event_name)
+        request.extensions["trace"] = trace
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+# provider -> (sync client, async client, stats); one keep-alive pool per provider per worker
+_http_clients: Dict[str, Tuple[httpx.Client, httpx.AsyncClient, _PoolStats]] = {}
+# (provider, model, temperature) -> LLM instance
+_llms: Dict[Tuple[str, str, float], object] = {}
+_lock = threading.Lock()
+
+def _get_http_clients(provider: str):
+    clients = _http_clients.get(provider)
+    if clients is None:
+        limits = httpx.Limits(
+            max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_POOL_KEEPALIVE_SECONDS,
+        )
+        timeout = httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS)
+        stats = _PoolStats()
+        clients = (
+            httpx.Client(limits=limits, timeout=timeout, event_hooks={"request": [stats.sync_hook]}),
+            httpx.AsyncClient(limits=limits, timeout=timeout, event_hooks={"request": [stats.async_hook]}),
+            stats,
+        )
+        _http_clients[provider] = clients
+    return clients
+
+def _build_llm(provider: str, temperature: float):
+    http_client, http_async_client, _ = _get_http_clients(provider)
+    if provider == "openai":
+        client_params = {
+            "api_key": settings.OPENAI_API_KEY,
+            "timeout": settings.LLM_TIMEOUT_SECONDS,
+            "max_retries": settings.LLM_MAX_RETRIES,
+        }
+        return OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            temperature=temperature,
+            model_name=settings.OPENAI_MODEL,
+            client=openai.OpenAI(http_client=http_client, **client_params).completions,
+            async_client=openai.AsyncOpenAI(http_client=http_async_client, **client_params).completions,
+        )
+
+    llm = ChatPerplexity(
+        pplx_api_key=settings.PPLX_API_KEY,
+        model=settings.PERPLEXITY_MODEL,
+        temperature=temperature,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        max_retries=settings.LLM_MAX_RETRIES,
+    )
+    # ChatPerplexity builds its own openai client; swap in one backed by the shared pool
+    llm.client = openai.OpenAI(
+        api_key=settings.PPLX_API_KEY,
+        base_url=PERPLEXITY_BASE_URL,
+        http_client=http_client,
+        timeout=settings.LLM_TIMEOUT_SECONDS,
+        max_retries=settings.LLM_MAX_RETRIES,
+    )
+    return llm
+
+class LatencyTracker:
+    """Rolling window of successful call latencies (seconds) plus error counts for one provider/model."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.calls += 1
+            self._samples.append(seconds)
+
+    def record_error(self):
+        with self._lock:
+            self.calls += 1
+            self.errors += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th percentile latency, or None until LLM_HEDGE_MIN_SAMPLES calls have succeeded."""
+        with self._lock:
+            if len(self._samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+                return None
+            return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+
+    def snapshot(self) -> dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "samples": len(self._samples),
+                "p50": round(p50, 3) if p50 is not None else None,
+                "p95": round(p95, 3) if p95 is not None else None,
+            }
+
+class RouterError(Exception):
+    """Raised when every provider behind an LLMRouter failed."""
+
+    def __init__(self, errors: List[Tuple[str, Exception]]):
+        self.errors = errors
+        super().__init__("All LLM providers failed: " + "; ".join(f"{name}: {e}" for name, e in errors))
+
+def has_native_async(llm: Runnable) -> bool:
+    """
+    Whether ``llm.ainvoke`` awaits a real async call. Otherwise it runs the
+    sync call in an executor thread, which cancelling the task does not stop.
+    """
+    if isinstance(llm, (BaseChatModel, BaseLLM)):
+        # These base implementations run _generate/_call in an executor
+        executor_backed = (BaseChatModel._agenerate, SimpleChatModel._agenerate, BaseLLM._agenerate, LLM._agenerate)
+        return type(llm)._agenerate not in executor_backed
+    if isinstance(llm, RunnableLambda):
+        return hasattr(llm, "afunc")
+    return type(llm).ainvoke is not Runnable.ainvoke
+
+class RoutedProvider:
+    def __init__(self, name: str, llm: Runnable, tracker: LatencyTracker, native_async: Optional[bool] = None):
+        self.name = name
+        self.llm = llm
+        self.tracker = tracker
+        # Only natively async providers are hedged; a cancelled thread-backed call keeps its HTTP request running
+        self.native_async = has_native_async(llm) if native_async is None else native_async
+
+class LLMRouter(Runnable):
+    """
+    Route one prompt across several LLM providers.
+
+    Providers are tried fastest-first by rolling median latency (configured
+    order until there are enough samples). ``ainvoke`` hedges: if the
+    leading provider has not answered within its LLM_HEDGE_PERCENTILE
+    latency, the same request is sent to the next provider, the first answer
+    wins and the other call is cancelled. Hedging only pairs providers with
+    native async calls (see ``has_native_async``; ChatPerplexity, for one,
+    runs its sync client in a thread), since cancelling anything else would
+    leave the losing request running and paid for. Any provider error falls
+    through to the next provider. ``invoke`` and ``astream`` only fall back
+    on errors (a stream falls back only if it fails before the first token).
+
+    Providers can be any Runnable, so fake providers with simulated latency
+    exercise the routing without network access (see benchmark_llm_router.py).
+    """
+
+    def __init__(self, providers: Sequence[RoutedProvider], hedge: bool = True):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers = list(providers)
+        self.hedge = hedge
+        self.stats = {"hedged": 0, "hedge_wins": 0, "fallbacks": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def ranked(self) -> List[RoutedProvider]:
+        """Providers ordered by median latency; ones without enough samples keep their configured order."""
+        def rank(item):
+            position, provider = item
+            p50 = provider.tracker.percentile(50)
+            return (0, p50, position) if p50 is not None else (1, 0.0, position)
+        return [provider for _, provider in sorted(enumerate(self.providers), key=rank)]
+
+    def hedge_delay(self, provider: RoutedProvider) -> float:
+        delay = provider.tracker.percentile(settings.LLM_HEDGE_PERCENTILE)
+        if delay is None:
+            delay = settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        return max(delay, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    async def _acall(self, provider: RoutedProvider, input: Any, config, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = await provider.llm.ainvoke(input, config, **kwargs)
+        except asyncio.CancelledError:
+            raise  # a cancelled hedge loser says nothing about the provider's health
+        except Exception:
+            provider.tracker.record_error()
+            raise
+        provider.tracker.record(time.perf_counter() - start)
+        return result
+
+    def invoke(self, input: Any, config=None, **kwargs):
+        errors = []
+        for provider in self.ranked():
+            start = time.perf_counter()
+            try:
+                result = provider.llm.invoke(input, config, **kwargs)
+            except Exception as e:
+                provider.tracker.record_error()
+                logger.warning(f"LLM provider {provider.name} failed, falling back: {str(e)}")
+                errors.append((provider.name, e))
+                self._count("fallbacks")
+                continue
+            provider.tracker.record(time.perf_counter() - start)
+            return result
+        raise RouterError(errors)
+
+    async def ainvoke(self, input: Any, config=None, **kwargs):
+        ranked = self.ranked()
+        pending: Dict[asyncio.Task, RoutedProvider] = {}
+        errors = []
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            provider = ranked[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(self._acall(provider, input, config, **kwargs))] = provider
+
+        launch()
+        try:
+            while pending:
+                # Hedge only while a single call is outstanding and a spare provider remains,
+                # and only if whichever call loses can actually be cancelled
+                current = next(iter(pending.values()))
+                can_hedge = (self.hedge and len(pending) == 1 and next_index < len(ranked)
+                             and current.native_async and ranked[next_index].native_async)
+                timeout = self.hedge_delay(current) if can_hedge else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"Hedging slow LLM call to {ranked[next_index].name} after {timeout:.2f}s")
+                    self._count("hedged")
+                    launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        if provider is not ranked[0]:
+                            self._count("hedge_wins" if pending else "fallbacks")
+                        return task.result()
+                    logger.warning(f"LLM provider {provider.name} failed: {str(task.exception())}")
+                    errors.append((provider.name, task.exception()))
+                if not pending and next_index < len(ranked):
+                    launch()
+            raise RouterError(errors)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def astream(self, input: Any, config=None, **kwargs) -> AsyncIterator[Any]:
+        errors = []
+        for provider in self.ranked():
+            start = time.perf_counter()
+            started = False
+            try:
+                async for chunk in provider.llm.astream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                provider.tracker.record_error()
+                if started:
+                    raise
+                logger.warning(f"LLM provider {provider.name} failed before streaming, falling back: {str(e)}")
+                errors.append((provider.name, e))
+                self._count("fallbacks")
+                continue
+            provider.tracker.record(time.perf_counter() - start)
+            return
+        raise RouterError(errors)
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "providers": [provider.name for provider in self.ranked()],
+            "hedgeable": [provider.name for provider in self.providers if provider.native_async],
+        }
+
+# "provider/model" -> latency tracker, shared by every temperature of that model
+_trackers: Dict[str, LatencyTracker] = {}
+# temperature -> router over LLM_ROUTER_PROVIDERS
+_routers: Dict[float, LLMRouter] = {}
+
+def get_latency_tracker(name: str) -> LatencyTracker:
+    with _lock:
+        tracker = _trackers.get(name)
+        if tracker is None:
+            tracker = LatencyTracker(settings.LLM_LATENCY_WINDOW)
+            _trackers[name] = tracker
+        return tracker
+
+def _provider_model(provider: str) -> str:
+    return settings.OPENAI_MODEL if provider == "openai" else settings.PERPLEXITY_MODEL
+
+def _router_providers() -> List[str]:
+    """Configured router providers that have credentials."""
+    keys = {"openai": settings.OPENAI_API_KEY, "perplexity": settings.PPLX_API_KEY}
+    names = [name.strip().lower() for name in settings.LLM_ROUTER_PROVIDERS.split(",") if name.strip()]
+    return [name for name in names if keys.get(name)]
+
+def _get_provider_llm(provider: str, temperature: float):
+    key = (provider, _provider_model(provider), float(temperature))
+    llm = _llms.get(key)
+    if llm is None:
+        with _lock:
+            llm = _llms.get(key)
+            if llm is None:
+                llm = _build_llm(provider, temperature)
+                _llms[key] = llm
+    return llm
 
 def get_llm(temperature: float = 0.7):
     """
     Factory function to get the appropriate LLM based on configuration.
+
+    Instances are cached per provider/model/temperature and share one HTTP
+    keep-alive pool per provider, so TLS handshakes are paid once per
+    connection rather than once per request. When LLM_ROUTER_PROVIDERS
+    names two or more providers with credentials, an LLMRouter over them
+    is returned instead.
     """
+    routed = _router_providers()
+    if len(routed) > 1:
+        router = _routers.get(float(temperature))
+        if router is None:
+            providers = [
+                RoutedProvider(f"{name}/{_provider_model(name)}", _get_provider_llm(name, temperature),
+                               get_latency_tracker(f"{name}/{_provider_model(name)}"))
+                for name in routed
+            ]
+            router = _routers.setdefault(float(temperature), LLMRouter(providers, hedge=settings.LLM_HEDGE_ENABLED))
+        return router
+
     if settings.LLM_PROVIDER.lower() == "openai" and settings.OPENAI_API_KEY:
-        return OpenAI(
-            api_key=settings.OPENAI_API_KEY, 
-            temperature=temperature, 
-            model_name=settings.OPENAI_MODEL
-        )
+        provider = "openai"
     else:
         # Default to Perplexity (requires PPLX_API_KEY)
         if not settings.PPLX_API_KEY:
             raise ValueError("PPLX_API_KEY is required when not using OpenAI")
-        
-        return ChatPerplexity(
-            pplx_api_key=settings.PPLX_API_KEY,
-            model=settings.PERPLEXITY_MODEL,
-            temperature=temperature
-        )
+        provider = "perplexity"
+    return _get_provider_llm(provider, temperature)
+
+def get_llm_client_stats() -> dict:
+    """Per-provider request and connection counts for the shared HTTP pools, plus router latency stats."""
+    return {
+        "clients": [f"{provider}/{model}@{temperature}" for provider, model, temperature in _llms],
+        "pools": {provider: stats.snapshot() for provider, (_, _, stats) in _http_clients.items()},
+        "latency": {name: tracker.snapshot() for name, tracker in _trackers.items()},
+        "routers": {str(temperature): router.get_stats() for temperature, router in _routers.items()},
+    }
@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+import numpy as np
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+def template_version(template: str) -> str:
+    """Version prompts by content so editing a template invalidates its cached responses."""
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
+
+def context_fingerprint(resume_context: str, job_context: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(resume_context.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(job_context.encode("utf-8"))
+    return digest.hexdigest()
+
+def _normalize(value: str) -> str:
+    return " ".join(value.lower().split())
+
+class _Entry:
+    def __init__(self, response: str, scope: str, company: str, query_vector: Optional[np.ndarray]):
+        self.response = response
+        self.scope = scope
+        self.company = company  # normalized; semantic matches never cross companies
+        self.query_vector = query_vector
+        self.created_at = time.time()
+
+class ResponseCache:
+    """
+    TTL/LRU cache of generated responses.
+
+    Keys combine the prompt template version, role, company and a fingerprint
+    of the retrieved resume/job context. Lookups try an exact key match first;
+    if RESPONSE_CACHE_SIMILARITY is set, they then accept an entry with the
+    same template, context and (normalized) company whose role embedding is
+    at least that cosine-similar (e.g. "Sr. Backend Engineer" vs "Senior
+    Backend Engineer"). Expired entries are dropped as lookups find them.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int, similarity: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "bypassed": 0}
+
+    @staticmethod
+    def _scope(template: str, resume_context: str, job_context: str) -> str:
+        return f"{template_version(template)}:{context_fingerprint(resume_context, job_context)}"
+
+    @staticmethod
+    def _key(scope: str, role: str, company: str) -> str:
+        return f"{scope}:{_normalize(role)}:{_normalize(company)}"
+
+    def _query_vector(self, role: str) -> Optional[np.ndarray]:
+        if self.similarity <= 0:
+            return None
+        from app.ai.embeddings import get_embeddings
+        return np.asarray(get_embeddings().embed_query(role), dtype=np.float32)
+
+    def _expired(self, entry: _Entry) -> bool:
+        return time.time() - entry.created_at > self.ttl_seconds
+
+    def get(self, template: str, role: str, company: str, resume_context: str, job_context: str) -> Optional[str]:
+        scope = self._scope(template, resume_context, job_context)
+        key = self._key(scope, role, company)
+        company = _normalize(company)
+        with self._lock:
+            for expired in [k for k, e in self._entries.items() if self._expired(e)]:
+                del self._entries[expired]
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return entry.response
+            candidates = [(k, e) for k, e in self._entries.items()
+                          if e.scope == scope and e.company == company and e.query_vector is not None]
+
+        if candidates:
+            query = self._query_vector(role)
+            matrix = np.vstack([e.query_vector for _, e in candidates])
+            scores = matrix @ query  # vectors are normalized, so this is cosine similarity
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity:
+                with self._lock:
+                    self.stats["semantic_hits"] += 1
+                logger.info(f"Semantic response cache hit (similarity {scores[best]:.3f})")
+                return candidates[best][1].response
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, template: str, role: str, company: str, resume_context: str, job_context: str, response: str):
+        scope = self._scope(template, resume_context, job_context)
+        entry = _Entry(response, scope, _normalize(company), self._query_vector(role))
+        with self._lock:
+            key = self._key(scope, role, company)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def record_bypass(self):
+        with self._lock:
+            self.stats["bypassed"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.stats["exact_hits"] + self.stats["semantic_hits"] + self.stats["misses"]
+            hits = lookups - self.stats["misses"]
+            return {
+                **self.stats,
+                "size": len(self._entries),
+                "capacity": self.max_size,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            }
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The process-wide response cache, or None when RESPONSE_CACHE_SIZE is 0."""
+    global _cache
+    if settings.RESPONSE_CACHE_SIZE <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                settings.RESPONSE_CACHE_SIZE,
+                settings.RESPONSE_CACHE_TTL_SECONDS,
+                settings.RESPONSE_CACHE_SIMILARITY,
+            )
+        return _cache
@@ -1,5 +1,99 @@
-from app.ai.vectorstore import get_vectorstore
+from dataclasses import dataclass, field
+from typing import List, Optional
+import asyncio
+import logging
+from langchain.schema import Document
+from app.ai.vectorstore import get_vectorstore, user_index_name
+from app.ai.context_budget import budget_documents
+from app.core.concurrency import run_blocking
+from app.core.config import settings
 
-def get_retriever(index_name="default", k=4):
-    vectorstore = get_vectorstore(index_name=index_name)  
+logger = logging.getLogger(__name__)
+
+RESUME_QUERY = "summarize my fit"
+JOB_QUERY = "summarize requirements"
+
+def get_retriever(index_name="default", k=4, user_id: Optional[int] = None):
+    vectorstore = get_vectorstore(index_name=index_name, user_id=user_id)
+    if settings.HYBRID_RETRIEVAL_ENABLED:
+        from app.ai.hybrid_retriever import HybridRetriever
+        return HybridRetriever(vectorstore=vectorstore, index_name=user_index_name(index_name, user_id), k=k)
     return vectorstore.as_retriever(search_kwargs={"k": k})
+
+@dataclass
+class RetrievalContext:
+    """
+    Resume and job chunks retrieved once per request.
+
+    Validation and generation both read from the same instance, so each
+    index is embedded and searched a single time per request.
+    """
+    resume_docs: List[Document] = field(default_factory=list)
+    job_docs: List[Document] = field(default_factory=list)
+
+    @property
+    def resume_context(self) -> str:
+        return "\n".join([d.page_content for d in self.resume_docs])
+
+    @property
+    def job_context(self) -> str:
+        return "\n".join([d.page_content for d in self.job_docs])
+
+def _is_missing_index(error: Exception) -> bool:
+    # RediSearch reports a user who has not uploaded anything yet as an unknown index
+    message = str(error).lower()
+    return "no such index" in message or "unknown index name" in message
+
+def _retrieve(index_name: str, query: str, k: int, user_id: Optional[int] = None) -> List[Document]:
+    """Search one index; only a not-yet-created index yields no chunks, every other failure propagates."""
+    try:
+        return get_retriever(index_name=index_name, k=k, user_id=user_id).get_relevant_documents(query)
+    except Exception as e:
+        if not _is_missing_index(e):
+            raise
+        logger.info(f"No {index_name} index yet: {str(e)}")
+        return []
+
+def _assemble(index_name: str, query: str, k: int, max_tokens: int, user_id: Optional[int] = None) -> List[Document]:
+    """
+    Retrieve chunks for one prompt section. With CONTEXT_BUDGET_ENABLED,
+    CONTEXT_FETCH_K candidates are deduplicated, MMR-ranked and cut to
+    ``max_tokens``; otherwise the top ``k`` chunks are used as-is.
+    """
+    if not settings.CONTEXT_BUDGET_ENABLED:
+        return _retrieve(index_name, query, k, user_id)
+    docs = _retrieve(index_name, query, max(k, settings.CONTEXT_FETCH_K), user_id)
+    try:
+        return budget_documents(query, docs, max_tokens)
+    except Exception as e:
+        logger.warning(f"Context budgeting failed for {index_name}, using top {k} chunks: {str(e)}")
+        return docs[:k]
+
+def _log_context(context: RetrievalContext, job: bool = True):
+    # Log the retrieved contexts for debugging
+    logger.info(f"Retrieved {len(context.resume_docs)} resume chunks and {len(context.job_docs)} job chunks")
+    if context.job_docs:
+        logger.info(f"Job context preview: {context.job_context[:200]}...")
+    elif job:
+        logger.warning("No job description chunks retrieved!")
+
+def build_retrieval_context(resume_k=4, job_k=4, user_id: Optional[int] = None) -> RetrievalContext:
+    context = RetrievalContext(
+        resume_docs=_assemble("resume", RESUME_QUERY, resume_k, settings.CONTEXT_RESUME_TOKENS, user_id),
+        job_docs=_assemble("job", JOB_QUERY, job_k, settings.CONTEXT_JOB_TOKENS, user_id),
+    )
+    _log_context(context)
+    return context
+
+async def abuild_retrieval_context(resume_k=4, job_k=4, user_id: Optional[int] = None) -> RetrievalContext:
+    """
+    Async variant of build_retrieval_context; both retrievals run concurrently
+    off the event loop. ``job_k=0`` skips the job index entirely.
+    """
+    retrievals = [run_blocking(_assemble, "resume", RESUME_QUERY, resume_k, settings.CONTEXT_RESUME_TOKENS, user_id)]
+    if job_k > 0:
+        retrievals.append(run_blocking(_assemble, "job", JOB_QUERY, job_k, settings.CONTEXT_JOB_TOKENS, user_id))
+    resume_docs, *job_docs = await asyncio.gather(*retrievals)
+    context = RetrievalContext(resume_docs=resume_docs, job_docs=job_docs[0] if job_docs else [])
+    _log_context(context, job=job_k > 0)
+    return context
@@ -1,6 +1,30 @@
+import hashlib
+from typing import Optional
 from app.core.config import settings
 
-def get_vectorstore(index_name="default"):  # Add index_name parameter
+def user_index_name(index_name: str, user_id: Optional[int] = None) -> str:
+    """
+    Resolve the per-user namespace for ``index_name``.
+
+    FAISS indexes are sharded on disk as ``users/<shard>/<user_id>/<index_name>``
+    (shard = first two hex digits of the user id hash) so no directory grows
+    unbounded. Pinecone users share one index per ``index_name`` and are kept
+    apart by namespace, ``<index_name>/user-<user_id>``; Redis gets a flat
+    ``<index_name>-user-<user_id>`` name. Without a user the shared global
+    index is used.
+    """
+    if user_id is None:
+        return index_name
+    if settings.VECTORSTORE_PROVIDER == "pinecone":
+        # Pinecone caps the number of indexes per project, namespaces are free
+        return f"{index_name}/user-{user_id}"
+    if settings.VECTORSTORE_PROVIDER == "redis":
+        return f"{index_name}-user-{user_id}"
+    shard = hashlib.sha1(str(user_id).encode("utf-8")).hexdigest()[:settings.FAISS_SHARD_PREFIX_LENGTH]
+    return f"users/{shard}/{user_id}/{index_name}"
+
+def get_vectorstore(index_name="default", user_id: Optional[int] = None):  # Add index_name parameter
+    index_name = user_index_name(index_name, user_id)
     if settings.VECTORSTORE_PROVIDER == "redis":
         from app.persistence.redis_client import get_redis_vectorstore
         return get_redis_vectorstore(index_name=index_name)  # Pass it through
@@ -4,46 +4,45 @@ from sqlalchemy.orm import Session
 from app.models.database import get_db
 from app.models.user import User
 from app.models.auth_schemas import UserCreate, UserLogin, UserResponse, Token
-from app.core.auth import get_password_hash, verify_password, create_access_token, get_current_active_user
+from app.core.auth import create_access_token, get_current_active_user
+from app.core.concurrency import run_blocking
+from app.core.password_hashing import HashingBusyError, ahash_password, averify_password
 from app.core.config import settings
+from app.services.user_service import UserConflictError, create_user
 
 router = APIRouter()
 
+def _busy(e: HashingBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
+def _find_user(db: Session, column, value):
+    return db.query(User).filter(column == value).first()
+
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    try:
+        hashed_password = await ahash_password(user.password)
+    except HashingBusyError as e:
+        raise _busy(e)
     
-    # Check if username already exists
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if db_user:
+    # One INSERT; the unique constraints on email/username detect existing users
+    try:
+        return await run_blocking(create_user, db, user, hashed_password)
+    except UserConflictError as e:
+        detail = "Username already taken" if e.field == "username" else "Email already registered"
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
+            detail=detail
         )
-    
-    # Create new user
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        email=user.email,
-        username=user.username,
-        full_name=user.full_name,
-        hashed_password=hashed_password
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
 
 @router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     # Find user by email
-    user = db.query(User).filter(User.email == user_credentials.email).first()
+    user = await run_blocking(_find_user, db, User.email, user_credentials.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,7 +51,11 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(user_credentials.password, user.hashed_password):
+    try:
+        valid, new_hash = await averify_password(user_credentials.password, user.hashed_password)
+    except HashingBusyError as e:
+        raise _busy(e)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -66,6 +69,11 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user"
         )
     
+    # BCRYPT_ROUNDS changed since this hash was made; store it at the current cost
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await run_blocking(db.commit)
+    
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -1,19 +1,51 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from app.models.request_models import ChatRequest
 from app.models.response_models import ChatResponse
 from app.ai.retriever import get_retriever
 from app.ai.llm_factory import get_llm  # Use factory instead
 from app.core.config import settings
+from app.core.auth import get_current_active_user
+from app.models.user import User
+from app.core.concurrency import run_blocking, generation_slot
+from app.utils.sse import format_sse, SSE_MEDIA_TYPE, SSE_HEADERS
+from langchain_core.output_parsers import StrOutputParser
 
 router = APIRouter()
 
+async def _get_context_snippets(message: str, user_id: int):
+    retriever = await run_blocking(get_retriever, index_name="resume", user_id=user_id)
+    docs = await run_blocking(retriever.get_relevant_documents, message)
+    return [doc.page_content for doc in docs]
+
+def _build_chat_prompt(context_snippets, message: str) -> str:
+    return f"Context: {context_snippets}\nQuestion: {message}"
+
 @router.post("/", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    retriever = get_retriever(index_name="resume")
-    docs = retriever.get_relevant_documents(request.message)
-    context_snippets = [doc.page_content for doc in docs]
+async def chat(request: ChatRequest, current_user: User = Depends(get_current_active_user)):
+    context_snippets = await _get_context_snippets(request.message, current_user.id)
 
     llm = get_llm(temperature=0)  # Use factory function
-    answer = llm.predict(f"Context: {context_snippets}\nQuestion: {request.message}")
+    async with generation_slot():
+        answer = await (llm | StrOutputParser()).ainvoke(_build_chat_prompt(context_snippets, request.message))
 
     return ChatResponse(reply=answer, context_used=context_snippets)
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, current_user: User = Depends(get_current_active_user)):
+    """Stream the reply as SSE `token` events, then a final `result` event."""
+    context_snippets = await _get_context_snippets(request.message, current_user.id)
+    llm = get_llm(temperature=0)
+
+    async def event_stream():
+        chunks = []
+        try:
+            async with generation_slot():
+                async for token in (llm | StrOutputParser()).astream(_build_chat_prompt(context_snippets, request.message)):
+                    chunks.append(token)
+                    yield format_sse("token", {"token": token})
+            yield format_sse("result", {"reply": "".join(chunks), "context_used": context_snippets})
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Error generating reply: {str(e)}"})
+
+    return StreamingResponse(event_stream(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
@@ -1,48 +1,159 @@
-from fastapi import APIRouter, HTTPException
+import time
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from app.models.request_models import GenerationRequest
 from app.models.response_models import GenerationResponse
 from app.services.cover_letter_service import CoverLetterService
 from app.services.recruiter_email_service import RecruiterEmailService
+from app.services.batch_generation_service import BatchGenerationService
+from app.models.batch_models import BatchGenerationRequest
+from app.core.concurrency import generation_slot
+from app.core.auth import get_current_active_user
+from app.core.config import settings
+from app.models.user import User
+from app.utils.sse import format_sse, SSE_MEDIA_TYPE, SSE_HEADERS
 
 router = APIRouter()
 
+def _format_recruiter_email(result: dict) -> str:
+    formatted_content = f"Subject Line Options:\n"
+    for i, subject in enumerate(result['subject_lines'], 1):
+        formatted_content += f"{i}. {subject}\n"
+    formatted_content += f"\nEmail:\n{result['email_body']}"
+    return formatted_content
+
 # Don't initialize here - do it in the endpoints
 # cover_letter_service = CoverLetterService()  # Remove this
 # recruiter_email_service = RecruiterEmailService()  # Remove this
 
 @router.post("/cover-letter", response_model=GenerationResponse)
-async def generate_cover_letter_api(request: GenerationRequest):
-    cover_letter_service = CoverLetterService()  # Initialize here instead
+async def generate_cover_letter_api(request: GenerationRequest, force_regenerate: bool = False,
+        current_user: User = Depends(get_current_active_user)):
+    cover_letter_service = CoverLetterService(user_id=current_user.id)  # Initialize here instead
     
     role = request.extra_context or "Software Engineer"
     company = request.job_id or "Unknown Company"
     
-    if not cover_letter_service.validate_inputs(role, company):
+    # Retrieve once; the same context is validated and used for generation
+    context = await cover_letter_service.abuild_context()
+    if not cover_letter_service.validate_inputs(role, company, context):
         raise HTTPException(status_code=400, detail="Insufficient context to generate cover letter. Please upload resume and job description first.")
     
     try:
-        content = cover_letter_service.generate(role, company)
+        async with generation_slot():
+            content = await cover_letter_service.agenerate(role, company, context=context, force_regenerate=force_regenerate)
         return GenerationResponse(content=content)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating cover letter: {str(e)}")
 
 @router.post("/recruiter-email", response_model=GenerationResponse)
-async def generate_recruiter_email_api(request: GenerationRequest):
-    recruiter_email_service = RecruiterEmailService()  # Initialize here instead
+async def generate_recruiter_email_api(request: GenerationRequest, force_regenerate: bool = False,
+        current_user: User = Depends(get_current_active_user)):
+    recruiter_email_service = RecruiterEmailService(user_id=current_user.id)  # Initialize here instead
     
     role = request.extra_context or "Software Engineer"
     company = request.job_id or "Unknown Company"
     
-    if not recruiter_email_service.validate_context(role, company):
+    # Retrieve once; the same context is validated and used for generation
+    context = await recruiter_email_service.abuild_context()
+    if not recruiter_email_service.validate_context(role, company, context):
         raise HTTPException(status_code=400, detail="Insufficient context to generate recruiter email. Please upload resume and job description first.")
     
     try:
-        result = recruiter_email_service.generate(role, company)
-        formatted_content = f"Subject Line Options:\n"
-        for i, subject in enumerate(result['subject_lines'], 1):
-            formatted_content += f"{i}. {subject}\n"
-        formatted_content += f"\nEmail:\n{result['email_body']}"
-        
-        return GenerationResponse(content=formatted_content)
+        async with generation_slot():
+            result = await recruiter_email_service.agenerate(role, company, context=context, force_regenerate=force_regenerate)
+        return GenerationResponse(content=_format_recruiter_email(result))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating recruiter email: {str(e)}")
+
+@router.post("/cover-letter/stream")
+async def stream_cover_letter_api(request: GenerationRequest, force_regenerate: bool = False,
+        current_user: User = Depends(get_current_active_user)):
+    """Stream the cover letter as SSE `token` events, then a final `result` event."""
+    cover_letter_service = CoverLetterService(user_id=current_user.id)
+    
+    role = request.extra_context or "Software Engineer"
+    company = request.job_id or "Unknown Company"
+    
+    # Retrieve once; the same context is validated and used for generation
+    context = await cover_letter_service.abuild_context()
+    if not cover_letter_service.validate_inputs(role, company, context):
+        raise HTTPException(status_code=400, detail="Insufficient context to generate cover letter. Please upload resume and job description first.")
+    
+    async def event_stream():
+        chunks = []
+        try:
+            async with generation_slot():
+                async for token in cover_letter_service.astream(role, company, context=context, force_regenerate=force_regenerate):
+                    chunks.append(token)
+                    yield format_sse("token", {"token": token})
+            yield format_sse("result", {"content": "".join(chunks)})
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Error generating cover letter: {str(e)}"})
+    
+    return StreamingResponse(event_stream(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+@router.post("/recruiter-email/stream")
+async def stream_recruiter_email_api(request: GenerationRequest, force_regenerate: bool = False,
+        current_user: User = Depends(get_current_active_user)):
+    """Stream the recruiter email as SSE `token`/`subject` events, then a final `result` event."""
+    recruiter_email_service = RecruiterEmailService(user_id=current_user.id)
+    
+    role = request.extra_context or "Software Engineer"
+    company = request.job_id or "Unknown Company"
+    
+    # Retrieve once; the same context is validated and used for generation
+    context = await recruiter_email_service.abuild_context()
+    if not recruiter_email_service.validate_context(role, company, context):
+        raise HTTPException(status_code=400, detail="Insufficient context to generate recruiter email. Please upload resume and job description first.")
+    
+    async def event_stream():
+        try:
+            async with generation_slot():
+                async for kind, value in recruiter_email_service.astream(role, company, context=context, force_regenerate=force_regenerate):
+                    if kind == "token":
+                        yield format_sse("token", {"token": value})
+                    elif kind == "subject":
+                        yield format_sse("subject", {"subject": value})
+                    else:
+                        yield format_sse("result", {"content": _format_recruiter_email(value), **value})
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Error generating recruiter email: {str(e)}"})
+    
+    return StreamingResponse(event_stream(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+@router.post("/batch")
+async def batch_generate_api(request: BatchGenerationRequest, current_user: User = Depends(get_current_active_user)):
+    """
+    Generate for many (role, company, job text) items, streaming an SSE `item`
+    event per result as it completes and a final `summary` event.
+    """
+    if len(request.items) > settings.BATCH_GENERATION_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_GENERATION_MAX_ITEMS} items per batch.")
+    
+    batch_service = BatchGenerationService(user_id=current_user.id)
+    # Retrieve the resume once, before streaming, so a missing resume is a 400 rather than N failed items
+    shared = await batch_service.abuild_context(request.items)
+    if not shared.resume_context:
+        raise HTTPException(status_code=400, detail="No resume found. Please upload a resume first.")
+    
+    async def event_stream():
+        start = time.perf_counter()
+        succeeded = 0
+        latencies = []
+        async for result in batch_service.astream(request.kind, request.items, request.force_regenerate, shared):
+            if result["status"] == "ok":
+                succeeded += 1
+                if request.kind == "recruiter_email":
+                    result["content"] = _format_recruiter_email(result)
+            latencies.append(result["seconds"])
+            yield format_sse("item", result)
+        yield format_sse("summary", {
+            "items": len(request.items),
+            "succeeded": succeeded,
+            "failed": len(request.items) - succeeded,
+            "seconds": round(time.perf_counter() - start, 3),
+            "max_item_seconds": max(latencies, default=0.0),
+        })
+    
+    return StreamingResponse(event_stream(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
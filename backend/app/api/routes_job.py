@@ -1,23 +1,105 @@
-from fastapi import APIRouter, UploadFile, File, Form
-import shutil
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, status
+import uuid
 from pathlib import Path
-from app.services.resume_ingestion import process_and_store_resume
+from typing import Optional
+from sqlalchemy.orm import Session
 from app.services.job_ingestion import store_job_description
+from app.services.ingestion_queue import get_ingestion_queue, QueueFullError
+from app.services.job_match_service import match_jobs
+from app.models.match_models import JobMatchRequest
+from app.models.job_posting_schemas import JobPostingBatch, JobPostingPage, JobPostingResponse
+from app.models.database import get_db
+from app.services.job_posting_store import get_posting, search_postings, store_postings
+from app.core.auth import get_current_active_user
+from app.core.concurrency import run_blocking
+from app.models.user import User
 
 router = APIRouter()
 
 UPLOAD_DIR = Path("./uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-@router.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...)):
-    filepath = UPLOAD_DIR / file.filename
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    result = process_and_store_resume(str(filepath))
-    return {"status": "uploaded", **result}
+def _public_job(job: dict) -> dict:
+    return {key: value for key, value in job.items() if key != "user_id"}
+
+@router.post("/upload-resume", status_code=status.HTTP_202_ACCEPTED)
+async def upload_resume(file: UploadFile = File(...), current_user: User = Depends(get_current_active_user)):
+    """Accept the upload immediately; parsing and indexing run on the ingestion queue."""
+    queue = get_ingestion_queue()
+    content = await file.read()
+    filepath = None
+    if queue.use_redis:
+        # Other processes consume Redis jobs, so they need the PDF on shared disk
+        filepath = UPLOAD_DIR / f"{current_user.id}-{uuid.uuid4().hex}-{Path(file.filename).name}"
+        await run_blocking(filepath.write_bytes, content)
+        payload = {"file_path": str(filepath), "user_id": current_user.id}
+    else:
+        payload = {"content": content, "user_id": current_user.id}
+    try:
+        job = queue.submit("resume", payload, user_id=current_user.id)
+    except QueueFullError as e:
+        if filepath is not None:
+            filepath.unlink(missing_ok=True)
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    return {"status": "queued", "job_id": job["id"]}
+
+@router.get("/ingestion/{job_id}")
+def get_ingestion_status(job_id: str, current_user: User = Depends(get_current_active_user)):
+    job = get_ingestion_queue().get(job_id)
+    if job is None or job.get("user_id") != current_user.id:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+    return _public_job(job)
 
 @router.post("/set-job-description")
-async def set_job_description(job_text: str = Form(...)):
-    result = store_job_description(job_text)
+async def set_job_description(job_text: str = Form(...), current_user: User = Depends(get_current_active_user)):
+    result = await run_blocking(store_job_description, job_text, user_id=current_user.id)
     return {"status": "job stored", **result}
+
+@router.post("/match")
+async def match_jobs_api(request: JobMatchRequest, current_user: User = Depends(get_current_active_user)):
+    """Rank postings against the user's resume by chunk embedding similarity (no LLM calls)."""
+    try:
+        return await run_blocking(match_jobs, current_user.id, request.job_texts, request.top_k, request.top_pairs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/postings")
+async def create_job_postings(request: JobPostingBatch, current_user: User = Depends(get_current_active_user),
+                              db: Session = Depends(get_db)):
+    """
+    Store postings; re-submitting a posting with the same content returns its existing id.
+
+    With index_vectors, embedding runs on the ingestion queue and
+    ``vectors_job_id`` can be polled at /ingestion/{job_id}.
+    """
+    result = await run_blocking(store_postings, db, current_user.id, request.postings)
+    if request.index_vectors and result["ids"]:
+        # Existing postings too: they may have been stored earlier without vectors
+        payload = {"posting_ids": result["ids"], "user_id": current_user.id}
+        try:
+            job = get_ingestion_queue().submit("postings", payload, user_id=current_user.id)
+        except QueueFullError as e:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+        result["vectors_job_id"] = job["id"]
+    return result
+
+@router.get("/postings", response_model=JobPostingPage)
+async def list_job_postings(q: Optional[str] = None, company: Optional[str] = None, title: Optional[str] = None,
+                            location: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                            cursor: Optional[str] = None, current_user: User = Depends(get_current_active_user),
+                            db: Session = Depends(get_db)):
+    """Full-text search (q, best match first) or list newest first, with filters and cursor pagination."""
+    try:
+        postings, next_cursor = await run_blocking(search_postings, db, current_user.id, q, company, title,
+                                                   location, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": postings, "next_cursor": next_cursor}
+
+@router.get("/postings/{posting_id}", response_model=JobPostingResponse)
+async def get_job_posting(posting_id: int, current_user: User = Depends(get_current_active_user),
+                          db: Session = Depends(get_db)):
+    posting = await run_blocking(get_posting, db, current_user.id, posting_id)
+    if posting is None:
+        raise HTTPException(status_code=404, detail="Job posting not found")
+    return posting
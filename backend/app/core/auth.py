@@ -8,9 +8,17 @@ from sqlalchemy.orm import Session
 from app.core.config import settings
 from app.models.database import get_db
 from app.models.user import User
+from app.core.user_cache import get_user_cache
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; min == max rounds makes any other cost "need update", so
+# changing BCRYPT_ROUNDS rehashes passwords transparently on the next login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 # JWT token security
 security = HTTPBearer()
@@ -52,10 +60,18 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     if email is None:
         raise credentials_exception
     
+    cache = get_user_cache()
+    user = cache.get(email) if cache is not None else None
+    if user is not None:
+        return user
+    
+    generation = cache.generation(email) if cache is not None else None
     user = db.query(User).filter(User.email == email).first()
     if user is None:
         raise credentials_exception
     
+    if cache is not None:
+        cache.put(user, generation)
     return user
 
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
@@ -0,0 +1,98 @@
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Shared, bounded pool for blocking work (retrieval, sync LLM clients, file IO)
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BLOCKING_POOL_SIZE,
+    thread_name_prefix="blocking"
+)
+_generation_semaphore: Optional[asyncio.Semaphore] = None
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a synchronous callable on the bounded worker pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+_DONE = object()
+
+def iterate_in_background(iterable: Iterable[T], maxsize: int = 16) -> Iterator[T]:
+    """
+    Drive ``iterable`` on a helper thread so producing the next items overlaps
+    with whatever the consumer does with the current one.
+
+    If the consumer stops early (an exception, or ``close()`` on the generator)
+    the producer is told to stop and the queue is drained, so the helper
+    thread never stays blocked on a full queue.
+    """
+    items: "queue.Queue" = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+            return
+        finally:
+            close = getattr(iterable, "close", None)
+            if stop.is_set() and close is not None:
+                close()
+        put((_DONE, None))
+
+    threading.Thread(target=produce, daemon=True, name="background-iter").start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        while True:
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                break
+
+def _get_generation_semaphore() -> asyncio.Semaphore:
+    global _generation_semaphore
+    if _generation_semaphore is None:
+        _generation_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_GENERATIONS)
+    return _generation_semaphore
+
+@asynccontextmanager
+async def generation_slot():
+    """Limit how many LLM generations are in flight in this worker at once."""
+    semaphore = _get_generation_semaphore()
+    async with semaphore:
+        yield
+
+def get_concurrency_stats() -> dict:
+    semaphore = _generation_semaphore
+    return {
+        "max_concurrent_generations": settings.MAX_CONCURRENT_GENERATIONS,
+        "available_generation_slots": semaphore._value if semaphore else settings.MAX_CONCURRENT_GENERATIONS,
+        "blocking_pool_size": settings.BLOCKING_POOL_SIZE,
+        "blocking_queue_depth": _executor._work_queue.qsize(),
+    }
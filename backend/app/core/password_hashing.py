@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple, TypeVar
+from app.core.auth import get_password_hash, pwd_context
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# bcrypt releases the GIL while hashing, so a thread pool gives real parallelism
+# without the pickling/startup cost of processes.
+_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_pending = 0
+_pending_lock = threading.Lock()
+_stats = {"completed": 0, "rejected": 0, "rehashed": 0}
+
+
+class HashingBusyError(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING hashes are already queued or running."""
+
+
+def _release(future: Future):
+    # Runs when the hash actually finishes (or is cancelled before starting), not when
+    # the awaiting request gives up, so _pending always matches the pool's real backlog
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+        if not future.cancelled() and future.exception() is None:
+            _stats["completed"] += 1
+
+
+async def _submit(func: Callable[..., T], *args) -> T:
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            _stats["rejected"] += 1
+            raise HashingBusyError("Too many authentication requests in progress, try again shortly")
+        _pending += 1
+    try:
+        future = _executor.submit(func, *args)
+    except BaseException:
+        with _pending_lock:
+            _pending -= 1
+        raise
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+async def ahash_password(password: str) -> str:
+    return await _submit(get_password_hash, password)
+
+
+async def averify_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify ``password`` off the event loop.
+
+    Returns ``(valid, new_hash)``; ``new_hash`` is set when the stored hash
+    used a different BCRYPT_ROUNDS cost and should be saved in its place.
+    """
+    valid, new_hash = await _submit(pwd_context.verify_and_update, password, hashed_password)
+    if new_hash is not None:
+        with _pending_lock:
+            _stats["rehashed"] += 1
+    return valid, new_hash
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash many passwords in parallel on the pool (bulk imports; blocks the caller)."""
+    return list(_executor.map(get_password_hash, passwords))
+
+
+def get_password_hashing_stats() -> dict:
+    with _pending_lock:
+        return {
+            **_stats,
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "pending": _pending,
+            "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        }
@@ -0,0 +1,251 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "auth:user:"
+REDIS_GENERATION_PREFIX = "auth:user-gen:"
+
+# Never kept in the cache (or in Redis); authentication only needs the profile
+EXCLUDED_FIELDS = frozenset({"hashed_password"})
+
+
+def _columns() -> list:
+    return [attr.key for attr in sa_inspect(User).column_attrs if attr.key not in EXCLUDED_FIELDS]
+
+
+def _to_fields(user: User) -> dict:
+    return {key: getattr(user, key) for key in _columns()}
+
+
+def _from_fields(fields: dict) -> User:
+    # A fresh transient instance per request, so callers never share (or lazily load on) a cached object
+    return User(**fields)
+
+
+def _dumps(fields: dict) -> str:
+    return json.dumps(fields, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+def _loads(fields: dict) -> dict:
+    for attr in sa_inspect(User).column_attrs:
+        value = fields.get(attr.key)
+        if isinstance(value, str):
+            try:
+                python_type = attr.columns[0].type.python_type
+            except NotImplementedError:
+                continue
+            if python_type is datetime:
+                fields[attr.key] = datetime.fromisoformat(value)
+    return fields
+
+
+class UserCache:
+    """
+    Short-TTL cache of authenticated users keyed by email (the JWT subject).
+
+    An in-process LRU answers most requests; with AUTH_USER_CACHE_REDIS the
+    entries are also shared through Redis so a cold worker avoids the
+    database too. Entries are dropped once a transaction that updated or
+    deleted the user row commits (see the session listeners below); other
+    workers' in-process copies expire within AUTH_USER_CACHE_TTL_SECONDS.
+
+    Every invalidation moves the email to a new generation (in Redis too,
+    when shared). Callers take ``generation(email)`` before reading the
+    database and pass it to ``put``, so a row read before an invalidation is
+    never cached after it. Local generations are sequence numbers kept for
+    the last ``max_size`` invalidated emails; a forgotten email reports the
+    last sequence dropped, which is at least its own, so a ``put`` from
+    before its invalidation still fails.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, use_redis: bool = False):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # email -> (expires_at, fields)
+        self._generations: "OrderedDict[str, int]" = OrderedDict()  # email -> sequence of its last invalidation
+        self._sequence = 0
+        self._generation_floor = 0  # generation of emails dropped from _generations
+        self._lock = threading.Lock()
+        self.redis = None
+        if use_redis:
+            try:
+                from app.persistence.redis_client import get_redis_connection
+                self.redis = get_redis_connection()
+            except Exception as e:
+                logger.warning(f"User cache Redis tier unavailable, using in-process cache only: {e}")
+        self.stats = {"hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0, "stale_puts": 0}
+
+    def _local_generation(self, email: str) -> int:
+        return self._generations.get(email, self._generation_floor)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def get(self, email: str) -> Optional[User]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(email)
+                self.stats["hits"] += 1
+                return _from_fields(entry[1])
+            local_generation = self._local_generation(email)
+
+        if self.redis is not None:
+            try:
+                raw, generation = self.redis.mget(REDIS_KEY_PREFIX + email, REDIS_GENERATION_PREFIX + email)
+            except Exception as e:
+                logger.warning(f"User cache Redis lookup failed: {e}")
+                raw = None
+            if raw:
+                cached = json.loads(raw)
+                # Written before the latest invalidation (by any worker): treat as a miss
+                if cached.get("generation") == int(generation or 0):
+                    fields = _loads(cached["fields"])
+                    self._store_local(email, fields, local_generation)
+                    self._count("redis_hits")
+                    return _from_fields(fields)
+
+        self._count("misses")
+        return None
+
+    def generation(self, email: str) -> Tuple[int, Optional[int]]:
+        """Token to pass to ``put``; take it before reading the user from the database."""
+        with self._lock:
+            local_generation = self._local_generation(email)
+        redis_generation = None
+        if self.redis is not None:
+            try:
+                redis_generation = int(self.redis.get(REDIS_GENERATION_PREFIX + email) or 0)
+            except Exception as e:
+                logger.warning(f"User cache Redis generation lookup failed: {e}")
+        return local_generation, redis_generation
+
+    def _store_local(self, email: str, fields: dict, generation: int) -> bool:
+        with self._lock:
+            if self._local_generation(email) != generation:
+                self.stats["stale_puts"] += 1
+                return False
+            self._entries[email] = (time.monotonic() + self.ttl_seconds, fields)
+            self._entries.move_to_end(email)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return True
+
+    def put(self, user: User, generation: Tuple[int, Optional[int]]):
+        """Cache ``user`` unless it was invalidated since ``generation`` was taken."""
+        local_generation, redis_generation = generation
+        fields = _to_fields(user)
+        if not self._store_local(user.email, fields, local_generation):
+            return
+        if self.redis is not None and redis_generation is not None:
+            try:
+                self.redis.set(REDIS_KEY_PREFIX + user.email,
+                               _dumps({"generation": redis_generation, "fields": fields}),
+                               ex=max(int(self.ttl_seconds), 1))
+            except Exception as e:
+                logger.warning(f"User cache Redis write failed: {e}")
+
+    def invalidate(self, email: str):
+        with self._lock:
+            self._entries.pop(email, None)
+            self._sequence += 1
+            self._generations[email] = self._sequence
+            self._generations.move_to_end(email)
+            while len(self._generations) > self.max_size:
+                _, self._generation_floor = self._generations.popitem(last=False)
+            self.stats["invalidations"] += 1
+        if self.redis is not None:
+            try:
+                pipeline = self.redis.pipeline()
+                pipeline.delete(REDIS_KEY_PREFIX + email)
+                pipeline.incr(REDIS_GENERATION_PREFIX + email)
+                # Outlives any entry written under the old generation, so expiry cannot revive one
+                pipeline.expire(REDIS_GENERATION_PREFIX + email, max(int(self.ttl_seconds), 1) * 10)
+                pipeline.execute()
+            except Exception as e:
+                logger.warning(f"User cache Redis invalidation failed: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["redis_hits"] + self.stats["misses"]
+            return {
+                **self.stats,
+                "db_lookups": self.stats["misses"],
+                "size": len(self._entries),
+                "hit_rate": round((lookups - self.stats["misses"]) / lookups, 3) if lookups else 0.0,
+                "redis": self.redis is not None,
+            }
+
+
+_cache: Optional[UserCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_user_cache() -> Optional[UserCache]:
+    """The process-wide user cache, or None when AUTH_USER_CACHE_SIZE is 0."""
+    global _cache
+    if settings.AUTH_USER_CACHE_SIZE <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS,
+                               settings.AUTH_USER_CACHE_REDIS)
+        return _cache
+
+
+def _user_emails(user: User) -> set:
+    """``user``'s current email and, if it just changed, the previous one."""
+    emails = {user.email}
+    history = sa_inspect(user).attrs.email.history
+    emails.update(history.deleted or ())
+    return {email for email in emails if email}
+
+
+def invalidate_user(user: User):
+    """Drop ``user`` from the cache under its current and (if it just changed) previous email."""
+    cache = get_user_cache()
+    if cache is None:
+        return
+    for email in _user_emails(user):
+        cache.invalidate(email)
+
+
+# Invalidate only once the change is committed: a flush is still invisible to
+# other connections, which would otherwise re-cache the old row after we drop it.
+_PENDING_KEY = "user_cache_invalidations"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    # Attribute history is still available here; it is reset right after
+    changed = [obj for obj in session.dirty if isinstance(obj, User) and session.is_modified(obj)]
+    changed += [obj for obj in session.deleted if isinstance(obj, User)]
+    for user in changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(_user_emails(user))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    emails = session.info.pop(_PENDING_KEY, None)
+    cache = get_user_cache()
+    if not emails or cache is None:
+        return
+    for email in emails:
+        cache.invalidate(email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -2,6 +2,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api import routes_chat, routes_generation, routes_job, routes_auth
+from app.ai.embeddings import warm_up_embeddings, get_embedding_stats, get_embeddings
+from app.ai.retriever import RESUME_QUERY, JOB_QUERY
+from app.ai.llm_factory import get_llm_client_stats
+from app.ai.response_cache import get_response_cache
+from app.core.concurrency import get_concurrency_stats
+from app.core.user_cache import get_user_cache
+from app.core.password_hashing import get_password_hashing_stats
+from app.models.database import get_database_stats
+from app.services.ingestion_queue import get_ingestion_queue
 
 
 def create_app() -> FastAPI:
@@ -27,10 +36,53 @@ def create_app() -> FastAPI:
     app.include_router(routes_generation.router, prefix="/generate", tags=["Generation"])
     app.include_router(routes_job.router, prefix="/job", tags=["Job Posting"])
 
+    @app.on_event("startup")
+    def warm_up():
+        if settings.EMBEDDING_WARMUP:
+            warm_up_embeddings()
+            # Pre-populate the query cache with the fixed retrieval prompts
+            for query in (RESUME_QUERY, JOB_QUERY):
+                get_embeddings().embed_query(query)
+
+    @app.on_event("startup")
+    def start_ingestion_queue():
+        get_ingestion_queue().start_consumers()
+
+    @app.on_event("shutdown")
+    def stop_ingestion_queue():
+        get_ingestion_queue().shutdown()
+
+    @app.on_event("shutdown")
+    def flush_vectorstores():
+        if settings.VECTORSTORE_PROVIDER == "faiss":
+            from app.persistence.faiss_client import flush_faiss_vectorstores
+            flush_faiss_vectorstores()
+
     @app.get("/health")
     def health_check():
         return {"status": "ok", "app_name": settings.APP_NAME}
 
+    @app.get("/metrics")
+    def metrics():
+        result = {
+            "embeddings": get_embedding_stats(),
+            "concurrency": get_concurrency_stats(),
+            "llm_clients": get_llm_client_stats(),
+            "ingestion": get_ingestion_queue().get_stats(),
+            "password_hashing": get_password_hashing_stats(),
+            "database": get_database_stats(),
+        }
+        response_cache = get_response_cache()
+        if response_cache is not None:
+            result["response_cache"] = response_cache.get_stats()
+        user_cache = get_user_cache()
+        if user_cache is not None:
+            result["user_cache"] = user_cache.get_stats()
+        if settings.VECTORSTORE_PROVIDER == "faiss":
+            from app.persistence.faiss_client import get_faiss_pool_stats
+            result["faiss_pool"] = get_faiss_pool_stats()
+        return result
+
     return app
 
 
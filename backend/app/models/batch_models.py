@@ -0,0 +1,12 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+class BatchGenerationItem(BaseModel):
+    role: str
+    company: str
+    job_text: Optional[str] = None  # Falls back to the stored job description when omitted
+
+class BatchGenerationRequest(BaseModel):
+    kind: Literal["cover_letter", "recruiter_email"] = "cover_letter"
+    items: List[BatchGenerationItem] = Field(..., min_length=1)
+    force_regenerate: bool = False
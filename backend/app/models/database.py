@@ -0,0 +1,212 @@
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+Base = declarative_base()
+
+
+class _PoolMetrics:
+    """Checkout wait times, pool timeouts and statement timings for one engine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.invalidated = 0
+        self.statements = 0
+        self.statement_seconds = 0.0
+        self.slow_statements = 0
+
+    def record_checkout(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def record_statement(self, seconds: float, slow: bool):
+        with self._lock:
+            self.statements += 1
+            self.statement_seconds += seconds
+            if slow:
+                self.slow_statements += 1
+
+    def count(self, attribute: str):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_checkout_ms": round(self.checkout_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_ms": round(self.max_checkout_seconds * 1000, 3),
+                "checkout_timeouts": self.timeouts,
+                "connections_opened": self.connections_opened,
+                "connections_invalidated": self.invalidated,
+                "statements": self.statements,
+                "avg_statement_ms": round(self.statement_seconds / self.statements * 1000, 3) if self.statements else 0.0,
+                "slow_statements": self.slow_statements,
+            }
+
+
+_metrics = _PoolMetrics()
+
+
+class _TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            _metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        _metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def _connect_args(url) -> dict:
+    if url.get_backend_name() != "postgresql" or settings.DB_STATEMENT_TIMEOUT_MS <= 0:
+        return {}
+    if url.get_driver_name() == "asyncpg":
+        # asyncpg has no libpq "options" string; it takes server settings directly
+        return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+
+def _pool_kwargs(url) -> dict:
+    if url.get_backend_name() == "sqlite":
+        return {}  # SQLite uses its own single-file pools
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": True,  # Reuse warm connections so idle extras can age out via recycle
+    }
+
+
+def _instrument(sync_engine):
+    """Attach pool and statement timing listeners to an Engine (or an AsyncEngine's sync_engine)."""
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        _metrics.count("connections_opened")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        _metrics.count("invalidated")
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        slow = seconds * 1000 >= settings.DB_SLOW_QUERY_MS
+        _metrics.record_statement(seconds, slow)
+        if slow:
+            logger.warning(f"Slow query ({seconds * 1000:.1f} ms): {' '.join(statement.split())[:500]}")
+
+
+def _build_engine():
+    url = make_url(settings.DATABASE_URL)
+    pool_kwargs = _pool_kwargs(url)
+    if pool_kwargs:
+        pool_kwargs["poolclass"] = _TimedQueuePool
+    engine = create_engine(url, echo=settings.DB_ECHO, connect_args=_connect_args(url), **pool_kwargs)
+    _instrument(engine)
+    return engine
+
+
+engine = _build_engine()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def async_database_url() -> str:
+    """DATABASE_ASYNC_URL, or DATABASE_URL switched to the asyncpg driver."""
+    if settings.DATABASE_ASYNC_URL:
+        return settings.DATABASE_ASYNC_URL
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() != "postgresql":
+        raise ValueError("DB_ASYNC_ENABLED needs a PostgreSQL DATABASE_URL or an explicit DATABASE_ASYNC_URL")
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+_async_engine = None
+_async_session_factory = None
+_async_lock = threading.Lock()
+
+
+def get_async_engine():
+    """Lazily built AsyncEngine (requires asyncpg); None unless DB_ASYNC_ENABLED."""
+    global _async_engine, _async_session_factory
+    if not settings.DB_ASYNC_ENABLED:
+        return None
+    with _async_lock:
+        if _async_engine is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+            url = make_url(async_database_url())
+            # Async engines need the asyncio-aware pool, so checkout waits are not timed here
+            pool_kwargs = _pool_kwargs(url)
+            _async_engine = create_async_engine(url, echo=settings.DB_ECHO, connect_args=_connect_args(url),
+                                                **pool_kwargs)
+            _instrument(_async_engine.sync_engine)
+            _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False)
+        return _async_engine
+
+
+async def get_async_db():
+    """FastAPI dependency yielding an AsyncSession for async routes (DB_ASYNC_ENABLED must be set)."""
+    if get_async_engine() is None:
+        raise RuntimeError("Async database sessions require DB_ASYNC_ENABLED=true")
+    async with _async_session_factory() as session:
+        yield session
+
+
+def _pool_status(pool) -> Optional[dict]:
+    if not isinstance(pool, QueuePool):
+        return None
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+def get_database_stats() -> dict:
+    stats = {"pool": _pool_status(engine.pool), **_metrics.snapshot()}
+    if _async_engine is not None:
+        stats["async_pool"] = _pool_status(_async_engine.sync_engine.pool)
+    return stats
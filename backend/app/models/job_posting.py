@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Computed, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.models.database import Base
+
+# Title matches rank above company/location, which rank above the description body
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '') || ' ' || coalesce(location, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+class JobPosting(Base):
+    __tablename__ = "job_postings"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    title = Column(String(300), nullable=False)
+    company = Column(String(300), nullable=False)
+    location = Column(String(300))
+    url = Column(String(2000))
+    description = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False)  # sha256 of the normalized posting
+    search_vector = Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Re-ingesting the same posting for a user is a no-op
+        UniqueConstraint("user_id", "content_hash", name="uq_job_postings_user_hash"),
+        # Keyset pagination walks (created_at, id) newest first within a user
+        Index("ix_job_postings_user_created", "user_id", created_at.desc(), id.desc()),
+        # Case-insensitive equality filters
+        Index("ix_job_postings_user_company", "user_id", func.lower(company)),
+        Index("ix_job_postings_user_title", "user_id", func.lower(title)),
+        Index("ix_job_postings_user_location", "user_id", func.lower(location)),
+        Index("ix_job_postings_search", search_vector, postgresql_using="gin"),
+    )
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+class JobPostingCreate(BaseModel):
+    title: str = Field(..., min_length=1, max_length=300)
+    company: str = Field(..., min_length=1, max_length=300)
+    location: Optional[str] = Field(None, max_length=300)
+    url: Optional[str] = Field(None, max_length=2000)
+    description: str = Field(..., min_length=1)
+
+class JobPostingBatch(BaseModel):
+    postings: List[JobPostingCreate] = Field(..., min_length=1, max_length=1000)
+    index_vectors: bool = False  # Also chunk/embed the postings into the postings index (for /job/match), on the ingestion queue
+
+class JobPostingResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    company: str
+    location: Optional[str] = None
+    url: Optional[str] = None
+    description: str
+    content_hash: str
+    created_at: datetime
+
+class JobPostingPage(BaseModel):
+    items: List[JobPostingResponse]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,7 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class JobMatchRequest(BaseModel):
+    job_texts: Optional[List[str]] = None  # Score these postings instead of the stored ones
+    top_k: int = Field(10, ge=1, le=500)
+    top_pairs: int = Field(3, ge=0, le=20)  # Best resume/job chunk pairs returned per job
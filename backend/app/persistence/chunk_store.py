@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_STORE_DIR = Path("./vectorstore/chunk_cache")
+
+
+class ChunkEmbeddingStore:
+    """
+    Append-only, content-addressed store of chunk embeddings for one model.
+
+    Vectors live in a raw float32 matrix (``vectors.f32``) that is read through
+    ``np.memmap``; ``hashes.txt`` holds one chunk hash per row. Vectors are
+    written before their hash, so every listed hash has a complete row even if
+    another worker is appending concurrently. A writer that dies in between
+    leaves unlisted rows behind; the next ``add`` truncates them away so row
+    ``i`` always belongs to hash line ``i``.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = directory / "vectors.f32"
+        self.hashes_path = directory / "hashes.txt"
+        self.meta_path = directory / "meta.json"
+        self.lock_path = directory / ".lock"
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._rows = 0  # complete hash lines read so far
+        self._hashes_size = 0
+        self.dim: Optional[int] = None
+        self._load_dim()
+
+    def _load_dim(self):
+        if self.meta_path.exists():
+            self.dim = json.loads(self.meta_path.read_text())["dim"]
+
+    def _file_lock(self):
+        handle = open(self.lock_path, "a")
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _refresh_index(self):
+        """Pick up rows appended since the last read (possibly by another worker)."""
+        if self.dim is None:
+            # Another worker may have created the store after we opened it
+            self._load_dim()
+        if not self.hashes_path.exists():
+            return
+        size = self.hashes_path.stat().st_size
+        if size == self._hashes_size:
+            return
+        with open(self.hashes_path, "r") as f:
+            f.seek(self._hashes_size)
+            data = f.read()
+        # Only consume complete lines
+        consumed = data.rfind("\n") + 1
+        for chunk_hash in data[:consumed].splitlines():
+            self._index.setdefault(chunk_hash, self._rows)
+            self._rows += 1
+        self._hashes_size += consumed
+
+    @staticmethod
+    def _truncate(path: Path, size: int):
+        if path.exists() and path.stat().st_size > size:
+            logger.warning(f"Truncating {path} from {path.stat().st_size} to {size} bytes (interrupted write)")
+            os.truncate(path, size)
+
+    def _row_count(self) -> int:
+        if self.dim is None or not self.vectors_path.exists():
+            return 0
+        return self.vectors_path.stat().st_size // (self.dim * 4)
+
+    def lookup(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Return stored vectors for whichever of ``hashes`` are known."""
+        with self._lock:
+            self._refresh_index()
+            rows = {h: self._index[h] for h in hashes if h in self._index}
+            if not rows or self.dim is None:
+                return {}
+            matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                               shape=(self._row_count(), self.dim))
+            return {h: np.array(matrix[row]) for h, row in rows.items() if row < matrix.shape[0]}
+
+    def add(self, hashes: List[str], vectors: np.ndarray):
+        """Append new rows; hashes already present are skipped."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(hashes):
+            return
+        with self._lock:
+            handle = self._file_lock()
+            try:
+                self._refresh_index()
+                if self.dim is None:
+                    self.dim = int(vectors.shape[1])
+                    # Written via rename so a reader never sees a partial meta.json
+                    tmp_path = self.meta_path.with_name(f".{self.meta_path.name}.tmp")
+                    tmp_path.write_text(json.dumps({"dim": self.dim}))
+                    os.replace(tmp_path, self.meta_path)
+                keep = [i for i, h in enumerate(hashes) if h not in self._index]
+                if not keep:
+                    return
+                # Drop rows and any partial hash line left by a writer that failed mid-append
+                self._truncate(self.vectors_path, self._rows * self.dim * 4)
+                self._truncate(self.hashes_path, self._hashes_size)
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vectors[keep].tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(self.hashes_path, "a") as f:
+                    f.write("".join(f"{hashes[i]}\n" for i in keep))
+                self._refresh_index()
+            finally:
+                handle.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_index()
+            return len(self._index)
+
+
+_stores: Dict[str, ChunkEmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_chunk_store(model_name: str) -> ChunkEmbeddingStore:
+    """Return the process-wide chunk embedding store for ``model_name``."""
+    with _stores_lock:
+        store = _stores.get(model_name)
+        if store is None:
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+            store = ChunkEmbeddingStore(CHUNK_STORE_DIR / slug)
+            _stores[model_name] = store
+        return store
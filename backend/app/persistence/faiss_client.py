@@ -1,47 +1,392 @@
 import os
+import pickle
+import shutil
+import tempfile
+import threading
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import Optional, Tuple
 import faiss
 from langchain_community.vectorstores import FAISS
 from langchain.schema import Document
 from app.ai.embeddings import get_embeddings
+from app.core.config import settings
 import logging
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 FAISS_DIR = Path("./vectorstore")
 FAISS_DIR.mkdir(exist_ok=True)
 
-def get_faiss_vectorstore(index_name="default"):
-    """Get or create FAISS vectorstore with proper error handling"""
-    embeddings = get_embeddings()
-    faiss_path = FAISS_DIR / f"{index_name}.faiss"
-    pkl_path = FAISS_DIR / f"{index_name}.pkl"
-    
-    if faiss_path.exists() and pkl_path.exists():
-        try:
-            logger.info(f"Loading existing FAISS index: {index_name}")
-            return FAISS.load_local(
-                str(FAISS_DIR), 
-                embeddings, 
-                index_name=index_name,
-                allow_dangerous_deserialization=True 
+
+class LockedFAISS(FAISS):
+    """
+    FAISS vectorstore whose reads, writes and snapshots share one re-entrant lock.
+
+    The pooled object is used from request threads, the ingestion queue and the
+    write-back timer at once; neither the faiss index nor the docstore dict is
+    safe to read while another thread mutates it. Code that walks the docstore
+    or the raw index directly holds ``vectorstore.lock`` while doing so.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+
+    def add_texts(self, *args, **kwargs):
+        with self.lock:
+            return super().add_texts(*args, **kwargs)
+
+    def add_embeddings(self, *args, **kwargs):
+        with self.lock:
+            return super().add_embeddings(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with self.lock:
+            return super().delete(*args, **kwargs)
+
+    def merge_from(self, *args, **kwargs):
+        with self.lock:
+            return super().merge_from(*args, **kwargs)
+
+    def similarity_search_with_score_by_vector(self, *args, **kwargs):
+        with self.lock:
+            return super().similarity_search_with_score_by_vector(*args, **kwargs)
+
+    def max_marginal_relevance_search_with_score_by_vector(self, *args, **kwargs):
+        with self.lock:
+            return super().max_marginal_relevance_search_with_score_by_vector(*args, **kwargs)
+
+    def snapshot(self):
+        """Serialized (index bytes, docstore pickle) in save_local's on-disk format."""
+        with self.lock:
+            return (
+                faiss.serialize_index(self.index).tobytes(),
+                pickle.dumps((self.docstore, self.index_to_docstore_id)),
             )
-        except Exception as e:
-            logger.warning(f"Failed to load existing index, creating new one: {e}")
-    
-    # Create new index with a single dummy document to avoid empty index issues
-    logger.info(f"Creating new FAISS index: {index_name}")
-    dummy_docs = [Document(page_content="Initial document", metadata={"source": "system"})]
-    vectorstore = FAISS.from_documents(dummy_docs, embeddings)
-    save_faiss_vectorstore(vectorstore, index_name=index_name)
-    return vectorstore
-
-def save_faiss_vectorstore(vectorstore: FAISS, index_name="default"):
-    """Save FAISS vectorstore to disk"""
+
+
+class _PooledIndex:
+    """A loaded FAISS index plus the bookkeeping needed to write it back lazily."""
+
+    def __init__(self, vectorstore: LockedFAISS, mtime: float):
+        self.lock = threading.RLock()
+        self.write_lock = threading.Lock()  # orders snapshot writes; never held with _pool_lock
+        self.mtime = mtime  # of the on-disk copy last merged or written; 0.0 if never on disk
+        # Chunk ids on disk as of that copy, so local and remote changes can be told apart
+        self.base_ids = set(vectorstore.index_to_docstore_id.values()) if mtime else set()
+        self.dirty = False
+        self.flush_timer: Optional[threading.Timer] = None
+        self.vectorstore = None
+        self.attach(vectorstore)
+
+    def attach(self, vectorstore: LockedFAISS):
+        # The entry's lock outlives reloads, so holders of an older object still serialize with the new one
+        vectorstore.lock = self.lock
+        self.vectorstore = vectorstore
+
+
+# Loaded indexes for this process, most recently used last.
+# _pool_lock only guards this dict and the stats; no disk IO happens while it is held.
+_pool: "OrderedDict[str, _PooledIndex]" = OrderedDict()
+_pool_lock = threading.RLock()
+_pool_stats = {"hits": 0, "loads": 0, "reloads": 0, "merges": 0, "evictions": 0, "flushes": 0,
+               "flush_failures": 0}
+
+
+def _count(stat: str):
+    with _pool_lock:
+        _pool_stats[stat] += 1
+
+
+def _index_location(index_name: str):
+    """Split a (possibly namespaced, e.g. ``users/3f/42/resume``) index name into folder and file stem."""
+    path = FAISS_DIR / index_name
+    return path.parent, path.name
+
+
+def _index_paths(index_name: str):
+    folder, name = _index_location(index_name)
+    return folder / f"{name}.faiss", folder / f"{name}.pkl"
+
+
+@contextmanager
+def _file_lock(index_name: str, exclusive: bool):
+    """
+    Cross-process lock on one index. The .faiss/.pkl pair is replaced with two
+    renames, so writers hold it exclusively and loaders shared; a loader can
+    then never pair a new index with an old docstore.
+    """
+    folder, name = _index_location(index_name)
+    folder.mkdir(parents=True, exist_ok=True)
+    handle = open(folder / f".{name}.lock", "a")
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        handle.close()
+
+
+def _disk_mtime(index_name: str) -> Optional[float]:
+    faiss_path, pkl_path = _index_paths(index_name)
     try:
-        vectorstore.save_local(str(FAISS_DIR), index_name=index_name)
-        logger.info(f"Saved FAISS index: {index_name}")
+        return max(faiss_path.stat().st_mtime, pkl_path.stat().st_mtime)
+    except FileNotFoundError:
+        return None
+
+
+def _read_index(index_name: str) -> Tuple[LockedFAISS, float]:
+    """Read the on-disk pair and its mtime; the caller holds the file lock."""
+    mtime = _disk_mtime(index_name)
+    if mtime is None:
+        raise FileNotFoundError(f"FAISS index {index_name} is not on disk")
+    logger.info(f"Loading existing FAISS index: {index_name}")
+    folder, name = _index_location(index_name)
+    vectorstore = LockedFAISS.load_local(
+        str(folder),
+        get_embeddings(),
+        index_name=name,
+        allow_dangerous_deserialization=True
+    )
+    return vectorstore, mtime
+
+
+def _load_from_disk(index_name: str) -> Optional[Tuple[LockedFAISS, float]]:
+    """The on-disk index and the mtime of the pair that was read, or None if there is none (or it is unreadable)."""
+    if _disk_mtime(index_name) is None:
+        return None
+    try:
+        with _file_lock(index_name, exclusive=False):
+            return _read_index(index_name)
     except Exception as e:
-        logger.error(f"Failed to save FAISS index {index_name}: {e}")
-        raise
+        logger.warning(f"Failed to load existing index, creating new one: {e}")
+        return None
+
+
+def _write_to_disk(snapshot, index_name: str) -> float:
+    """Write a snapshot via a temp dir and rename; the caller holds the exclusive file lock."""
+    index_bytes, docstore_bytes = snapshot
+    folder, name = _index_location(index_name)
+    folder.mkdir(parents=True, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=folder, prefix=f".{name}-")
+    try:
+        faiss_path, pkl_path = _index_paths(index_name)
+        staged = []
+        for path, data in ((faiss_path, index_bytes), (pkl_path, docstore_bytes)):
+            tmp_path = os.path.join(tmp_dir, path.name)
+            with open(tmp_path, "wb") as handle:
+                handle.write(data)
+            staged.append((tmp_path, path))
+        for tmp_path, path in staged:
+            os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return _disk_mtime(index_name) or 0.0
+
+
+def _merge_disk_changes(entry: _PooledIndex, disk: LockedFAISS):
+    """
+    Apply what other workers wrote since ``entry.base_ids`` was on disk to the
+    pooled object in place, keeping this worker's unsaved adds and deletes.
+    The caller holds ``entry.lock``.
+    """
+    vectorstore = entry.vectorstore
+    disk_positions = {chunk_id: position for position, chunk_id in disk.index_to_docstore_id.items()}
+    local_ids = set(vectorstore.index_to_docstore_id.values())
+    added = [chunk_id for chunk_id in disk_positions if chunk_id not in entry.base_ids and chunk_id not in local_ids]
+    removed = [chunk_id for chunk_id in entry.base_ids if chunk_id not in disk_positions and chunk_id in local_ids]
+    if added:
+        docs = [disk.docstore.search(chunk_id) for chunk_id in added]
+        vectors = [disk.index.reconstruct(disk_positions[chunk_id]).tolist() for chunk_id in added]
+        vectorstore.add_embeddings(
+            list(zip([doc.page_content for doc in docs], vectors)),
+            metadatas=[doc.metadata for doc in docs],
+            ids=added,
+        )
+    if removed:
+        vectorstore.delete(removed)
+    entry.base_ids = set(disk_positions)
+    _count("merges")
+
+
+def _flush_entry(index_name: str, entry: _PooledIndex) -> bool:
+    """
+    Write a dirty index back. Under the exclusive file lock, a copy another
+    worker wrote since our last sync is merged in first, so its updates are
+    kept rather than overwritten. The snapshot is taken under the entry lock
+    and written outside it, so searches and ingestion are not blocked on disk
+    IO. Returns False (and leaves the entry dirty) if the write failed.
+    """
+    with entry.write_lock:
+        with entry.lock:
+            if entry.flush_timer is not None:
+                entry.flush_timer.cancel()
+                entry.flush_timer = None
+            if not entry.dirty:
+                return True
+        try:
+            with _file_lock(index_name, exclusive=True):
+                disk = None
+                disk_mtime = _disk_mtime(index_name)
+                if disk_mtime is not None and disk_mtime != entry.mtime:
+                    disk, _ = _read_index(index_name)
+                with entry.lock:
+                    if disk is not None:
+                        logger.info(f"FAISS index {index_name} changed on disk, merging before save")
+                        _merge_disk_changes(entry, disk)
+                    snapshot = entry.vectorstore.snapshot()
+                    saved_ids = set(entry.vectorstore.index_to_docstore_id.values())
+                    entry.dirty = False
+                mtime = _write_to_disk(snapshot, index_name)
+        except Exception as e:
+            with entry.lock:
+                entry.dirty = True
+            _count("flush_failures")
+            logger.error(f"Failed to save FAISS index {index_name}: {e}")
+            return False
+        with entry.lock:
+            entry.mtime = mtime
+            entry.base_ids = saved_ids
+    _count("flushes")
+    logger.info(f"Saved FAISS index: {index_name}")
+    return True
+
+
+def _evict_if_needed():
+    """Flush and drop least recently used indexes beyond FAISS_POOL_SIZE; unsaved ones stay pooled."""
+    skipped = set()
+    while True:
+        with _pool_lock:
+            candidates = [(name, entry) for name, entry in _pool.items() if name not in skipped]
+            if len(_pool) <= settings.FAISS_POOL_SIZE or not candidates:
+                return
+            index_name, entry = candidates[0]
+        if not _flush_entry(index_name, entry):
+            skipped.add(index_name)  # keep its writes in memory; retried on the next eviction pass
+            continue
+        with entry.lock, _pool_lock:  # same order as everywhere else: entry lock, then pool lock
+            # Only drop it if nobody re-dirtied or replaced it while we were writing
+            if _pool.get(index_name) is entry and not entry.dirty:
+                del _pool[index_name]
+                _pool_stats["evictions"] += 1
+                logger.info(f"Evicted FAISS index from pool: {index_name}")
+            else:
+                skipped.add(index_name)
+
+
+def _refresh_if_stale(index_name: str, entry: _PooledIndex):
+    """Merge in a copy another worker wrote; unsaved local changes (dirty entries) are kept."""
+    with entry.lock:
+        synced_mtime = entry.mtime
+    disk_mtime = _disk_mtime(index_name)
+    if disk_mtime is None or disk_mtime == synced_mtime:
+        _count("hits")
+        return
+    # Load outside the entry lock so searches keep running meanwhile
+    loaded = _load_from_disk(index_name)
+    if loaded is None:
+        return
+    disk, mtime = loaded
+    with entry.lock:
+        if entry.mtime != synced_mtime:
+            return  # a flush or another refresh synced with disk while we were loading
+        _merge_disk_changes(entry, disk)
+        entry.mtime = mtime
+    _count("reloads")
+
+
+def get_faiss_vectorstore(index_name="default"):
+    """Get or create FAISS vectorstore, served from the in-process pool when possible"""
+    with _pool_lock:
+        entry = _pool.get(index_name)
+        if entry is not None:
+            _pool.move_to_end(index_name)
+    if entry is not None:
+        _refresh_if_stale(index_name, entry)
+        return entry.vectorstore
+
+    # Load (or create) outside the pool lock; if two threads race, the first insert wins
+    loaded = _load_from_disk(index_name)
+    created = loaded is None
+    if loaded is not None:
+        vectorstore, disk_mtime = loaded
+    else:
+        # Create new index with a single dummy document to avoid empty index issues
+        logger.info(f"Creating new FAISS index: {index_name}")
+        dummy_docs = [Document(page_content="Initial document", metadata={"source": "system"})]
+        vectorstore = LockedFAISS.from_documents(dummy_docs, get_embeddings())
+
+    with _pool_lock:
+        entry = _pool.get(index_name)
+        inserted = entry is None
+        if inserted:
+            entry = _PooledIndex(vectorstore, 0.0 if created else disk_mtime)
+            _pool[index_name] = entry
+            _pool_stats["loads"] += 1
+        _pool.move_to_end(index_name)
+
+    if inserted and created:
+        save_faiss_vectorstore(entry.vectorstore, index_name=index_name)
+    _evict_if_needed()
+    return entry.vectorstore
+
+
+def save_faiss_vectorstore(vectorstore, index_name="default"):
+    """
+    Mark the index dirty and schedule a write-back.
+
+    Writes are debounced by FAISS_FLUSH_DELAY_SECONDS so a burst of uploads
+    results in a single rewrite; a delay of 0 writes synchronously. Call it
+    after releasing ``vectorstore.lock``: it may flush and evict other indexes.
+    """
+    if not isinstance(vectorstore, LockedFAISS):
+        raise TypeError("save_faiss_vectorstore expects a vectorstore from get_faiss_vectorstore")
+    with _pool_lock:
+        entry = _pool.get(index_name)
+        if entry is None:
+            entry = _PooledIndex(vectorstore, 0.0)
+            _pool[index_name] = entry
+        _pool.move_to_end(index_name)
+
+    with entry.lock:
+        if entry.vectorstore is not vectorstore:
+            entry.attach(vectorstore)
+        entry.dirty = True
+        if settings.FAISS_FLUSH_DELAY_SECONDS > 0 and entry.flush_timer is None:
+            entry.flush_timer = threading.Timer(
+                settings.FAISS_FLUSH_DELAY_SECONDS, _flush_entry, args=(index_name, entry)
+            )
+            entry.flush_timer.daemon = True
+            entry.flush_timer.start()
+
+    if settings.FAISS_FLUSH_DELAY_SECONDS <= 0:
+        _flush_entry(index_name, entry)
+    _evict_if_needed()
+
+
+def flush_faiss_vectorstores():
+    """Write every dirty pooled index to disk (used at shutdown)."""
+    with _pool_lock:
+        entries = list(_pool.items())
+    failed = [index_name for index_name, entry in entries if not _flush_entry(index_name, entry)]
+    if failed:
+        logger.error(f"FAISS indexes left unsaved at flush: {failed}")
+
+
+def get_faiss_pool_stats() -> dict:
+    with _pool_lock:
+        entries = list(_pool.items())
+        stats = {**_pool_stats, "size": len(entries), "capacity": settings.FAISS_POOL_SIZE}
+    stats["dirty"] = [name for name, entry in entries if entry.dirty]
+    return stats
+
+
+atexit.register(flush_faiss_vectorstores)
@@ -0,0 +1,179 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from langchain.schema import Document
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_INDEX_DIR = Path("./vectorstore/keyword")
+
+# Keeps skill tokens such as "c++", "c#", "node.js" and "ci/cd" intact
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i in is it its my of on or our that the their this to was "
+    "were will with you your we".split()
+)
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.rstrip("./-")
+        if token and token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+class KeywordIndex:
+    """
+    BM25 inverted index over the chunks of one vector index.
+
+    Chunks are keyed by the same ids the vector store uses, so
+    ``replace_document`` can add and remove them incrementally. The index is
+    persisted as one JSON file holding chunk texts, metadata and postings.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.chunks: Dict[str, dict] = {}  # chunk id -> {"text", "metadata", "length"}
+        self.postings: Dict[str, Dict[str, int]] = {}  # term -> {chunk id: term frequency}
+        self.total_length = 0
+        self.lock = threading.RLock()
+        self.mtime: Optional[float] = None
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self):
+        with self.lock:
+            data = json.loads(self.path.read_text())
+            self.chunks = data["chunks"]
+            self.postings = data["postings"]
+            self.total_length = sum(chunk["length"] for chunk in self.chunks.values())
+            self.mtime = self.path.stat().st_mtime
+
+    def save(self):
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"chunks": self.chunks, "postings": self.postings}))
+            os.replace(tmp_path, self.path)
+            self.mtime = self.path.stat().st_mtime
+
+    def add(self, ids: List[str], texts: List[str], metadatas: Optional[List[dict]] = None):
+        with self.lock:
+            for i, (chunk_id, text) in enumerate(zip(ids, texts)):
+                if chunk_id in self.chunks:
+                    continue
+                terms = Counter(tokenize(text))
+                length = sum(terms.values())
+                self.chunks[chunk_id] = {"text": text, "metadata": metadatas[i] if metadatas else {}, "length": length}
+                self.total_length += length
+                for term, frequency in terms.items():
+                    self.postings.setdefault(term, {})[chunk_id] = frequency
+
+    def remove(self, ids: List[str]):
+        with self.lock:
+            for chunk_id in ids:
+                chunk = self.chunks.pop(chunk_id, None)
+                if chunk is None:
+                    continue
+                self.total_length -= chunk["length"]
+                for term in set(tokenize(chunk["text"])):
+                    postings = self.postings.get(term)
+                    if postings is not None:
+                        postings.pop(chunk_id, None)
+                        if not postings:
+                            del self.postings[term]
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """Top ``k`` chunks by BM25 score; chunks sharing no query term are never returned."""
+        with self.lock:
+            if not self.chunks:
+                return []
+            count = len(self.chunks)
+            average_length = self.total_length / count or 1.0
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    length = self.chunks[chunk_id]["length"]
+                    norm = frequency + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (BM25_K1 + 1) / norm
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [
+                (Document(page_content=self.chunks[chunk_id]["text"], metadata=self.chunks[chunk_id]["metadata"]), score)
+                for chunk_id, score in best
+            ]
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+
+# Loaded keyword indexes for this process, most recently used last
+_pool: "OrderedDict[str, KeywordIndex]" = OrderedDict()
+_pool_lock = threading.Lock()
+
+
+def _index_path(index_name: str) -> Path:
+    return KEYWORD_INDEX_DIR / settings.VECTORSTORE_PROVIDER / f"{index_name}.json"
+
+
+def get_keyword_index(index_name: str) -> KeywordIndex:
+    """
+    The keyword index for ``index_name`` (same, possibly user-namespaced, name
+    as the vector index). Reloaded when another worker has rewritten the file.
+    """
+    with _pool_lock:
+        index = _pool.get(index_name)
+        if index is None:
+            index = KeywordIndex(_index_path(index_name))
+            _pool[index_name] = index
+            while len(_pool) > settings.KEYWORD_INDEX_POOL_SIZE:
+                _pool.popitem(last=False)
+        _pool.move_to_end(index_name)
+
+    with index.lock:
+        try:
+            mtime = index.path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime is not None and mtime != index.mtime:
+            try:
+                index.load()
+            except Exception as e:
+                logger.warning(f"Failed to load keyword index {index_name}: {e}")
+    return index
+
+
+def backfill_from_faiss(index: KeywordIndex, vectorstore) -> int:
+    """Build a missing keyword index from a FAISS docstore (indexes created before keyword search existed)."""
+    with index.lock:
+        if index.exists:
+            return 0
+        ids, texts, metadatas = [], [], []
+        with vectorstore.lock:
+            for chunk_id in vectorstore.index_to_docstore_id.values():
+                doc = vectorstore.docstore.search(chunk_id)
+                if isinstance(doc, Document) and (doc.metadata or {}).get("source") != "system":
+                    ids.append(chunk_id)
+                    texts.append(doc.page_content)
+                    metadatas.append(doc.metadata or {})
+        index.add(ids, texts, metadatas)
+        index.save()
+        logger.info(f"Backfilled keyword index {index.path.name} with {len(ids)} chunks")
+        return len(ids)
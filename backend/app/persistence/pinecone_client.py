@@ -4,8 +4,10 @@ from langchain.vectorstores import Pinecone
 from app.ai.embeddings import get_embeddings
 
 def get_pinecone_vectorstore(index_name="default"):
+    """``index_name`` may carry a namespace, ``<index>/<namespace>`` (see user_index_name)."""
+    index_name, _, namespace = index_name.partition("/")
     pinecone.init(api_key=settings.PINECONE_API_KEY, environment=settings.PINECONE_ENVIRONMENT)
     embeddings = get_embeddings()
     if index_name not in pinecone.list_indexes():
         pinecone.create_index(name=index_name, dimension=1536, metric="cosine")
-    return Pinecone.from_existing_index(index_name=index_name, embedding=embeddings)
+    return Pinecone.from_existing_index(index_name=index_name, embedding=embeddings, namespace=namespace or None)
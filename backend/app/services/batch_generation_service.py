@@ -0,0 +1,86 @@
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional
+from langchain.schema import Document
+from app.ai.context_budget import budget_documents
+from app.ai.retriever import JOB_QUERY, RetrievalContext, abuild_retrieval_context
+from app.core.concurrency import generation_slot, run_blocking
+from app.core.config import settings
+from app.models.batch_models import BatchGenerationItem
+from app.services.cover_letter_service import CoverLetterService
+from app.services.recruiter_email_service import RecruiterEmailService
+from app.utils.text_splitter import split_text
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BatchGenerationService:
+    """
+    Generate cover letters or recruiter emails for many postings at once.
+
+    Resume context is retrieved once for the whole batch; each item's job
+    context comes from its own job text (or the stored job description), and
+    LLM calls run with at most BATCH_GENERATION_CONCURRENCY in flight.
+    """
+
+    def __init__(self, user_id: Optional[int] = None):
+        self.user_id = user_id
+        self.cover_letter_service = CoverLetterService(user_id=user_id)
+        self.recruiter_email_service = RecruiterEmailService(user_id=user_id)
+
+    def _item_context(self, shared: RetrievalContext, item: BatchGenerationItem, job_k: int = 4) -> RetrievalContext:
+        if not item.job_text:
+            return shared
+        job_docs = [Document(page_content=chunk) for chunk in split_text(item.job_text)]
+        if settings.CONTEXT_BUDGET_ENABLED:
+            job_docs = budget_documents(JOB_QUERY, job_docs, settings.CONTEXT_JOB_TOKENS)
+        else:
+            job_docs = job_docs[:job_k]
+        return RetrievalContext(resume_docs=shared.resume_docs, job_docs=job_docs)
+
+    async def _generate_item(self, kind: str, index: int, item: BatchGenerationItem, shared: RetrievalContext,
+                             semaphore: asyncio.Semaphore, force_regenerate: bool) -> dict:
+        result = {"index": index, "role": item.role, "company": item.company}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                context = await run_blocking(self._item_context, shared, item)
+                async with generation_slot():
+                    if kind == "recruiter_email":
+                        email = await self.recruiter_email_service.agenerate(
+                            item.role, item.company, context=context, force_regenerate=force_regenerate
+                        )
+                        result.update(email)
+                    else:
+                        result["content"] = await self.cover_letter_service.agenerate(
+                            item.role, item.company, context=context, force_regenerate=force_regenerate
+                        )
+                result["status"] = "ok"
+            except Exception as e:
+                logger.error(f"Batch item {index} ({item.role} at {item.company}) failed: {str(e)}")
+                result.update(status="error", error=str(e))
+            result["seconds"] = round(time.perf_counter() - start, 3)
+        return result
+
+    async def abuild_context(self, items: List[BatchGenerationItem]) -> RetrievalContext:
+        """Shared context for a batch; the stored job description is only searched if some item needs it."""
+        job_k = 4 if any(not item.job_text for item in items) else 0
+        return await abuild_retrieval_context(job_k=job_k, user_id=self.user_id)
+
+    async def astream(self, kind: str, items: List[BatchGenerationItem], force_regenerate: bool = False,
+                      shared: Optional[RetrievalContext] = None) -> AsyncIterator[dict]:
+        """Yield one result dict per item, in completion order (``shared`` from abuild_context, if already built)."""
+        if shared is None:
+            shared = await self.abuild_context(items)
+        semaphore = asyncio.Semaphore(settings.BATCH_GENERATION_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(self._generate_item(kind, i, item, shared, semaphore, force_regenerate))
+            for i, item in enumerate(items)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Client went away: don't keep paying for LLM calls nobody will read
+            for task in tasks:
+                task.cancel()
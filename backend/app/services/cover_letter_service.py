@@ -1,16 +1,37 @@
-from typing import Optional
-from app.ai.chains import generate_cover_letter
-from app.ai.retriever import get_retriever
+from typing import Optional, AsyncIterator
+from app.ai.chains import generate_cover_letter, agenerate_cover_letter, astream_cover_letter
+from app.ai.retriever import get_retriever, RetrievalContext, build_retrieval_context, abuild_retrieval_context
 import logging
 
 logger = logging.getLogger(__name__)
 
 class CoverLetterService:
-    def __init__(self):
-        self.resume_retriever = get_retriever(index_name="resume")
-        self.job_retriever = get_retriever(index_name="job")
+    def __init__(self, user_id: Optional[int] = None):
+        self.user_id = user_id
+        self._resume_retriever = None
+        self._job_retriever = None
 
-    def generate(self, role: str, company: str, additional_context: Optional[str] = None) -> str:
+    @property
+    def resume_retriever(self):
+        if self._resume_retriever is None:
+            self._resume_retriever = get_retriever(index_name="resume", user_id=self.user_id)
+        return self._resume_retriever
+
+    @property
+    def job_retriever(self):
+        if self._job_retriever is None:
+            self._job_retriever = get_retriever(index_name="job", user_id=self.user_id)
+        return self._job_retriever
+
+    def build_context(self) -> RetrievalContext:
+        """Retrieve resume and job context once for both validation and generation."""
+        return build_retrieval_context(user_id=self.user_id)
+
+    async def abuild_context(self) -> RetrievalContext:
+        return await abuild_retrieval_context(user_id=self.user_id)
+
+    def generate(self, role: str, company: str, additional_context: Optional[str] = None,
+                 context: Optional[RetrievalContext] = None, force_regenerate: bool = False) -> str:
         """
         Generate a cover letter using RAG from resume and job description.
         
@@ -18,19 +39,47 @@ class CoverLetterService:
             role: Job title/position
             company: Company name
             additional_context: Any extra context to include
+            context: Pre-retrieved context; retrieved on demand if omitted
+            force_regenerate: Skip the response cache and call the LLM
             
         Returns:
             Generated cover letter content
         """
         try:
             logger.info(f"Generating cover letter for {role} at {company}")
-            content = generate_cover_letter(role, company)
+            if context is None:
+                context = self.build_context()
+            content = generate_cover_letter(role, company, context, force_regenerate)
             logger.info("Cover letter generated successfully")
             return content
         except Exception as e:
             logger.error(f"Error generating cover letter: {str(e)}")
             raise
 
+    async def agenerate(self, role: str, company: str, additional_context: Optional[str] = None,
+                        context: Optional[RetrievalContext] = None, force_regenerate: bool = False) -> str:
+        """Async variant of generate that does not block the event loop."""
+        try:
+            logger.info(f"Generating cover letter for {role} at {company}")
+            if context is None:
+                context = await self.abuild_context()
+            content = await agenerate_cover_letter(role, company, context, force_regenerate)
+            logger.info("Cover letter generated successfully")
+            return content
+        except Exception as e:
+            logger.error(f"Error generating cover letter: {str(e)}")
+            raise
+
+    async def astream(self, role: str, company: str, context: Optional[RetrievalContext] = None,
+                      force_regenerate: bool = False) -> AsyncIterator[str]:
+        """Yield cover letter tokens as they are generated."""
+        logger.info(f"Streaming cover letter for {role} at {company}")
+        if context is None:
+            context = await self.abuild_context()
+        async for token in astream_cover_letter(role, company, context, force_regenerate):
+            yield token
+        logger.info("Cover letter streamed successfully")
+
     def get_resume_context(self, query: str = "summarize skills and experience", k: int = 4) -> str:
         """Get relevant resume context for cover letter generation."""
         try:
@@ -49,10 +98,12 @@ class CoverLetterService:
             logger.error(f"Error retrieving job context: {str(e)}")
             return ""
 
-    def validate_inputs(self, role: str, company: str) -> bool:
+    def validate_inputs(self, role: str, company: str, context: Optional[RetrievalContext] = None) -> bool:
         """Validate that we have sufficient context to generate a quality cover letter."""
-        resume_context = self.get_resume_context()
-        job_context = self.get_job_context()
+        if context is None:
+            context = self.build_context()
+        resume_context = context.resume_context
+        job_context = context.job_context
         
         if not resume_context:
             logger.warning("No resume context found")
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from app.ai.vectorstore import get_vectorstore
+from app.ai.chunk_embeddings import add_chunks
+from app.persistence.keyword_index import backfill_from_faiss, get_keyword_index
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIR = Path("./vectorstore/manifests")
+
+# Serialize writers per index so a replace is never interleaved with another
+_index_locks: Dict[str, threading.Lock] = {}
+_index_locks_guard = threading.Lock()
+
+def _index_lock(index_name: str) -> threading.Lock:
+    with _index_locks_guard:
+        return _index_locks.setdefault(index_name, threading.Lock())
+
+def document_version(chunks: List[str]) -> str:
+    """Content hash of a document's chunks; identical uploads get the same version."""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+def _is_faiss(vectorstore) -> bool:
+    return hasattr(vectorstore, "docstore") and hasattr(vectorstore, "index_to_docstore_id")
+
+class _Manifest:
+    """
+    doc_id -> {version, chunk_ids} for stores we cannot scan (Redis, Pinecone).
+
+    FAISS keeps the same information in each chunk's metadata, so it needs no
+    manifest; its docstore is scanned instead.
+    """
+
+    def __init__(self, index_name: str):
+        MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", index_name)
+        self.path = MANIFEST_DIR / f"{settings.VECTORSTORE_PROVIDER}-{slug}.json"
+        self.documents: Dict[str, dict] = {}
+        if self.path.exists():
+            self.documents = json.loads(self.path.read_text())
+
+    def save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.documents))
+        os.replace(tmp_path, self.path)
+
+def _faiss_document_chunks(vectorstore, doc_ids) -> Dict[Optional[str], Dict[str, Optional[str]]]:
+    """
+    doc_id -> {chunk id: version} for ``doc_ids`` in one docstore scan;
+    placeholder docs are listed under ``None`` so they get purged.
+    """
+    documents: Dict[Optional[str], Dict[str, Optional[str]]] = {}
+    with vectorstore.lock:
+        for chunk_id in vectorstore.index_to_docstore_id.values():
+            doc = vectorstore.docstore.search(chunk_id)
+            metadata = getattr(doc, "metadata", {}) or {}
+            doc_id = metadata.get("doc_id")
+            if doc_id is not None and doc_id in doc_ids:
+                documents.setdefault(doc_id, {})[chunk_id] = metadata.get("version")
+            elif doc_id is None and metadata.get("source") == "system":
+                documents.setdefault(None, {})[chunk_id] = None
+    return documents
+
+def _delete_chunks(vectorstore, chunk_ids: List[str]):
+    if not chunk_ids:
+        return
+    key_prefix = getattr(vectorstore, "key_prefix", None)
+    if key_prefix is not None:
+        # Redis stores chunks under "<key_prefix>:<id>" and deletes by full key
+        vectorstore.delete([f"{key_prefix}:{chunk_id}" for chunk_id in chunk_ids], redis_url=settings.REDIS_URL)
+    else:
+        vectorstore.delete(chunk_ids)
+
+def _update_keyword_index(vectorstore, index_name: str, ids: List[str], texts: List[str],
+                          metadatas: List[dict], stale_ids: List[str]):
+    """Mirror a replace into the BM25 index kept alongside the vector index."""
+    try:
+        keyword_index = get_keyword_index(index_name)
+        if not keyword_index.exists and _is_faiss(vectorstore):
+            # First write to an index that predates keyword search: seed it with every
+            # existing chunk, or BM25 would only ever see documents ingested from now on
+            backfill_from_faiss(keyword_index, vectorstore)
+        keyword_index.add(ids, texts, metadatas)
+        keyword_index.remove(stale_ids)
+        keyword_index.save()
+    except Exception as e:
+        # Hybrid search falls back to dense results, so a keyword failure must not fail ingestion
+        logger.error(f"Failed to update keyword index {index_name}: {str(e)}")
+
+def replace_documents(index_name: str,
+                      documents: List[Tuple[str, List[str], Optional[List[dict]]]]) -> dict:
+    """
+    Atomically replace several documents, given as ``(doc_id, chunks, metadatas)``.
+
+    The index is locked and scanned once, every new chunk is embedded and
+    added in one call and every stale chunk deleted in another, so a batch
+    costs one pass over the index instead of one per document. New chunks
+    are added before old ones are deleted, so readers always see complete
+    documents; unchanged documents are skipped. For FAISS, deletion removes
+    the vectors from the flat index, which compacts it.
+    """
+    prepared = {}
+    for doc_id, chunks, metadatas in documents:
+        version = document_version(chunks)
+        prepared[doc_id] = (
+            version,
+            chunks,
+            [f"{doc_id}:{version}:{i}" for i in range(len(chunks))],
+            [
+                {**(metadatas[i] if metadatas else {}), "doc_id": doc_id, "version": version, "chunk": i}
+                for i in range(len(chunks))
+            ],
+        )
+
+    results = {}
+    add_ids, add_texts, add_metadatas, stale_ids = [], [], [], []
+    with _index_lock(index_name):
+        vectorstore = get_vectorstore(index_name=index_name)
+        manifest = None
+        if _is_faiss(vectorstore):
+            existing_documents = _faiss_document_chunks(vectorstore, set(prepared))
+            stale_ids.extend(existing_documents.pop(None, {}))
+        else:
+            manifest = _Manifest(index_name)
+            existing_documents = {
+                doc_id: {chunk_id: entry.get("version") for chunk_id in entry.get("chunk_ids", [])}
+                for doc_id, entry in manifest.documents.items() if doc_id in prepared
+            }
+
+        for doc_id, (version, chunks, chunk_ids, metadatas) in prepared.items():
+            existing = existing_documents.get(doc_id, {})
+            current = {chunk_id for chunk_id in chunk_ids if chunk_id in existing}
+            stale = [chunk_id for chunk_id in existing if chunk_id not in current]
+            unchanged = len(current) == len(chunk_ids) and not stale
+            results[doc_id] = {"chunks_indexed": len(chunks), "chunks_removed": len(stale), "version": version,
+                               "unchanged": unchanged}
+            if unchanged:
+                continue
+            new = [i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in current]
+            add_ids.extend(chunk_ids[i] for i in new)
+            add_texts.extend(chunks[i] for i in new)
+            add_metadatas.extend(metadatas[i] for i in new)
+            stale_ids.extend(stale)
+
+        unchanged_chunks = sum(len(prepared[doc_id][1]) for doc_id, result in results.items() if result["unchanged"])
+        report = {"chunks_reused": unchanged_chunks, "chunks_embedded": 0}
+        if not add_ids and not stale_ids:
+            logger.info(f"All {len(prepared)} documents in {index_name} unchanged")
+        else:
+            added = add_chunks(vectorstore, add_texts, metadatas=add_metadatas, ids=add_ids)
+            report["chunks_reused"] += added["chunks_reused"]
+            report["chunks_embedded"] += added["chunks_embedded"]
+            _delete_chunks(vectorstore, stale_ids)
+            _update_keyword_index(vectorstore, index_name, add_ids, add_texts, add_metadatas, stale_ids)
+
+            if manifest is not None:
+                for doc_id, (version, _, chunk_ids, _) in prepared.items():
+                    manifest.documents[doc_id] = {"version": version, "chunk_ids": chunk_ids}
+                manifest.save()
+            else:
+                from app.persistence.faiss_client import save_faiss_vectorstore
+                # add/delete lock the index themselves; the save must not run under vectorstore.lock
+                save_faiss_vectorstore(vectorstore, index_name=index_name)
+            logger.info(f"Replaced {len(prepared)} documents in {index_name}: {len(add_ids)} chunks added, "
+                        f"{len(stale_ids)} removed")
+
+    return {
+        "documents": results,
+        "chunks_indexed": sum(result["chunks_indexed"] for result in results.values()),
+        "chunks_removed": len(stale_ids),
+        **report,
+    }
+
+def replace_document(index_name: str, doc_id: str, chunks: List[str],
+                     metadatas: Optional[List[dict]] = None) -> dict:
+    """
+    Atomically replace every chunk of ``doc_id`` in ``index_name`` with ``chunks``.
+
+    Re-ingesting unchanged content is a no-op; see replace_documents.
+    """
+    batch = replace_documents(index_name, [(doc_id, chunks, metadatas)])
+    return {**batch["documents"][doc_id], "chunks_removed": batch["chunks_removed"],
+            "chunks_reused": batch["chunks_reused"], "chunks_embedded": batch["chunks_embedded"]}
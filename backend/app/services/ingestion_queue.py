@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+from app.services.resume_ingestion import process_and_store_resume
+from app.services.job_posting_store import index_stored_postings
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+REDIS_QUEUE_KEY = "ingest:queue"
+REDIS_JOB_PREFIX = "ingest:job:"
+
+class QueueFullError(Exception):
+    """Raised when the ingestion backlog is at INGESTION_MAX_QUEUED."""
+
+# Task name -> callable(payload, progress); kept by name so Redis payloads stay JSON.
+# In-memory jobs may carry raw bytes in "content"; Redis jobs reference a file path.
+_TASKS: Dict[str, Callable] = {
+    "resume": lambda payload, progress: process_and_store_resume(
+        payload["content"] if "content" in payload else payload["file_path"], user_id=payload.get("user_id"), progress=progress
+    ),
+    "postings": lambda payload, progress: index_stored_postings(
+        payload["user_id"], payload["posting_ids"], progress=progress
+    ),
+}
+
+class _MemoryJobStore:
+    def __init__(self):
+        self._jobs: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def put(self, job: dict):
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            self._expire()
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updated_at=time.time())
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] in (QUEUED, RUNNING))
+
+    def _expire(self):
+        cutoff = time.time() - settings.INGESTION_JOB_TTL_SECONDS
+        for job_id in [j for j, job in self._jobs.items()
+                       if job["status"] in (COMPLETED, FAILED) and job["updated_at"] < cutoff]:
+            del self._jobs[job_id]
+
+class _RedisJobStore:
+    def __init__(self):
+        from app.persistence.redis_client import get_redis_connection
+        self.redis = get_redis_connection()
+
+    def put(self, job: dict):
+        self.redis.set(REDIS_JOB_PREFIX + job["id"], json.dumps(job), ex=settings.INGESTION_JOB_TTL_SECONDS)
+
+    def update(self, job_id: str, **fields):
+        job = self.get(job_id)
+        if job is not None:
+            job.update(fields, updated_at=time.time())
+            self.put(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        raw = self.redis.get(REDIS_JOB_PREFIX + job_id)
+        return json.loads(raw) if raw else None
+
+    def pending(self) -> int:
+        return self.redis.llen(REDIS_QUEUE_KEY)
+
+class IngestionQueue:
+    """
+    Bounded background queue for ingestion work.
+
+    Jobs run on a dedicated pool of INGESTION_WORKERS threads, so upload
+    bursts cannot starve the generation endpoints. With
+    INGESTION_QUEUE_BACKEND="redis", jobs and their status live in Redis
+    and any worker process may pick them up.
+    """
+
+    def __init__(self):
+        self.use_redis = settings.INGESTION_QUEUE_BACKEND == "redis"
+        self.store = _RedisJobStore() if self.use_redis else _MemoryJobStore()
+        self._executor = ThreadPoolExecutor(max_workers=settings.INGESTION_WORKERS,
+                                            thread_name_prefix="ingestion")
+        self._submit_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._consumers_started = False
+        self._consumers: List[Future] = []
+        self._futures: Dict[Future, str] = {}  # in-memory jobs not yet finished -> job id
+        self._futures_lock = threading.Lock()
+
+    def submit(self, task: str, payload: dict, user_id: Optional[int] = None) -> dict:
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "task": task,
+            "user_id": user_id,
+            "status": QUEUED,
+            "stage": "queued",
+            "progress": 0.0,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._submit_lock:
+            if self.store.pending() >= settings.INGESTION_MAX_QUEUED:
+                raise QueueFullError("Ingestion queue is full, try again shortly")
+            self.store.put(job)
+        if self.use_redis:
+            self.store.redis.rpush(REDIS_QUEUE_KEY, json.dumps({"id": job["id"], "task": task, "payload": payload}))
+        else:
+            future = self._executor.submit(self._run, job["id"], task, payload)
+            with self._futures_lock:
+                self._futures[future] = job["id"]
+            future.add_done_callback(self._forget)
+        return job
+
+    def _forget(self, future: Future):
+        with self._futures_lock:
+            self._futures.pop(future, None)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def _run(self, job_id: str, task: str, payload: dict):
+        def progress(stage: str, fraction: float):
+            self.store.update(job_id, stage=stage, progress=round(fraction, 3))
+
+        self.store.update(job_id, status=RUNNING, stage="starting")
+        start = time.perf_counter()
+        try:
+            result = _TASKS[task](payload, progress)
+            self.store.update(job_id, status=COMPLETED, stage="done", progress=1.0, result=result,
+                              seconds=round(time.perf_counter() - start, 3))
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}")
+            self.store.update(job_id, status=FAILED, stage="failed", error=str(e),
+                              seconds=round(time.perf_counter() - start, 3))
+        finally:
+            if "file_path" in payload:
+                # Redis uploads are staged on shared disk only until their job has run
+                Path(payload["file_path"]).unlink(missing_ok=True)
+
+    def start_consumers(self):
+        """Start Redis consumer threads (no-op for the in-memory backend)."""
+        if not self.use_redis or self._consumers_started:
+            return
+        self._consumers_started = True
+        for _ in range(settings.INGESTION_WORKERS):
+            self._consumers.append(self._executor.submit(self._consume))
+
+    def _consume(self):
+        while not self._stopping.is_set():
+            try:
+                item = self.store.redis.blpop(REDIS_QUEUE_KEY, timeout=1)
+            except Exception as e:
+                logger.warning(f"Ingestion queue unavailable: {e}")
+                time.sleep(1)
+                continue
+            if item is None:
+                continue
+            message = json.loads(item[1])
+            self._run(message["id"], message["task"], message["payload"])
+
+    def shutdown(self):
+        """
+        Stop taking work and let running jobs finish (up to INGESTION_SHUTDOWN_TIMEOUT_SECONDS).
+
+        Redis jobs still queued stay in Redis for other workers; in-memory jobs
+        that never started are marked failed so their status does not hang at "queued".
+        """
+        self._stopping.set()
+        with self._futures_lock:
+            futures = dict(self._futures)
+        _, not_done = wait(list(futures) + self._consumers, timeout=settings.INGESTION_SHUTDOWN_TIMEOUT_SECONDS)
+        cancelled = 0
+        for future in not_done:
+            if future in futures and future.cancel():
+                self.store.update(futures[future], status=FAILED, stage="failed",
+                                  error="Server shut down before the job started")
+                cancelled += 1
+        if not_done:
+            logger.warning(f"Ingestion shutdown: {cancelled} queued jobs failed, "
+                           f"{len(not_done) - cancelled} still running after the timeout")
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": settings.INGESTION_QUEUE_BACKEND,
+            "workers": settings.INGESTION_WORKERS,
+            "pending": self.store.pending(),
+            "max_queued": settings.INGESTION_MAX_QUEUED,
+        }
+
+_queue: Optional[IngestionQueue] = None
+_queue_lock = threading.Lock()
+
+def get_ingestion_queue() -> IngestionQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = IngestionQueue()
+        return _queue
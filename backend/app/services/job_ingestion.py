@@ -1,38 +1,38 @@
 from app.utils.text_splitter import split_text
-from app.ai.vectorstore import get_vectorstore
+from app.ai.vectorstore import user_index_name
+from typing import List, Optional
+from app.services.document_ingestion import replace_document, replace_documents, document_version
 import logging
 
 logger = logging.getLogger(__name__)
 
-def store_job_description(job_text: str, index_name="job"):
+# Postings to rank with /job/match; kept apart from the "job" index, whose one
+# document is the job description generation retrieves from
+POSTINGS_INDEX = "postings"
+
+def store_job_description(job_text: str, index_name="job", user_id: Optional[int] = None):
+    index_name = user_index_name(index_name, user_id)
     chunks = split_text(job_text)
-    vectorstore = get_vectorstore(index_name=index_name)
-    
-    # Clear existing job description chunks before adding new ones
-    # This ensures we only use the most recent job description
-    try:
-        # Get all existing documents to clear them
-        existing_docs = vectorstore.get()
-        if existing_docs and hasattr(existing_docs, 'documents') and existing_docs.documents:
-            # Delete all existing documents
-            doc_ids = [doc.metadata.get('id', str(i)) for i, doc in enumerate(existing_docs.documents)]
-            if doc_ids:
-                vectorstore.delete(doc_ids)
-                logger.info(f"Cleared {len(doc_ids)} existing job description chunks")
-    except Exception as e:
-        logger.warning(f"Could not clear existing job chunks: {e}")
-        # If clearing fails, try to delete by content (fallback)
-        try:
-            vectorstore.delete(["Initial document", "dummy"])
-        except:
-            pass
-    
-    # Add new job description chunks
-    vectorstore.add_texts(chunks)
-    
-    try:
-        from app.persistence.faiss_client import save_faiss_vectorstore
-        save_faiss_vectorstore(vectorstore, index_name=index_name)
-    except ImportError:
-        pass
-    return {"chunks_indexed": len(chunks)}
+    # Replace the previous job description; only the most recent one is used
+    return replace_document(index_name, "job", chunks)
+
+def store_job_descriptions_bulk(job_texts: List[str], index_name=POSTINGS_INDEX, user_id: Optional[int] = None):
+    """
+    Append many job descriptions to the postings index (backfills, see import_jobs.py).
+
+    Unlike store_job_description this keeps existing postings; each posting
+    is its own document, so re-ingesting the same text is a no-op.
+    """
+    index_name = user_index_name(index_name, user_id)
+    documents = []
+    for job_text in job_texts:
+        chunks = split_text(job_text)
+        # Keyed by content, so re-running a backfill does not duplicate postings
+        documents.append((f"job-{document_version(chunks)}", chunks, [{"source": "bulk"}] * len(chunks)))
+    # One index scan, one embedding pass and one write for the whole batch
+    result = replace_documents(index_name, documents)
+    report = {"jobs_indexed": len(job_texts)}
+    for key in ("chunks_indexed", "chunks_reused", "chunks_embedded"):
+        report[key] = result[key]
+    logger.info(f"Bulk indexed {len(job_texts)} job descriptions ({report['chunks_indexed']} chunks)")
+    return report
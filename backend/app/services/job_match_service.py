@@ -0,0 +1,139 @@
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.ai.chunk_embeddings import lookup_chunk_vectors
+from app.ai.vectorstore import get_vectorstore, user_index_name
+from app.persistence.keyword_index import get_keyword_index
+from app.services.job_ingestion import POSTINGS_INDEX
+from app.utils.text_splitter import split_text
+import logging
+
+logger = logging.getLogger(__name__)
+
+# doc_id -> (chunk texts, (n, dim) normalized vectors)
+DocumentChunks = Dict[str, Tuple[List[str], np.ndarray]]
+
+def _group(doc_ids: List[str], texts: List[str], vectors: np.ndarray) -> DocumentChunks:
+    rows: Dict[str, List[int]] = {}
+    for row, doc_id in enumerate(doc_ids):
+        rows.setdefault(doc_id, []).append(row)
+    return {doc_id: ([texts[r] for r in indices], vectors[indices]) for doc_id, indices in rows.items()}
+
+def load_document_chunks(index_name: str, user_id: Optional[int] = None) -> DocumentChunks:
+    """
+    Chunk texts and embeddings of every document in an index, grouped by doc_id.
+
+    FAISS vectors are read straight out of the flat index. Other providers
+    cannot be enumerated, so their chunks come from the keyword index and
+    their vectors from the chunk embedding store filled at ingestion.
+    """
+    index_name = user_index_name(index_name, user_id)
+    vectorstore = get_vectorstore(index_name=index_name)
+    doc_ids, texts = [], []
+    if hasattr(vectorstore, "index_to_docstore_id"):
+        rows = []
+        # One consistent view of docstore + vectors while ingestion may be writing
+        with vectorstore.lock:
+            for row, chunk_id in vectorstore.index_to_docstore_id.items():
+                doc = vectorstore.docstore.search(chunk_id)
+                metadata = getattr(doc, "metadata", None) or {}
+                if "doc_id" not in metadata:
+                    continue  # placeholder chunk of an empty index
+                rows.append(row)
+                doc_ids.append(metadata["doc_id"])
+                texts.append(doc.page_content)
+            if not rows:
+                return {}
+            vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)[rows]
+    else:
+        keyword_index = get_keyword_index(index_name)
+        with keyword_index.lock:
+            chunks = list(keyword_index.chunks.values())
+        chunks = [chunk for chunk in chunks if "doc_id" in chunk["metadata"]]
+        if not chunks:
+            return {}
+        doc_ids = [chunk["metadata"]["doc_id"] for chunk in chunks]
+        texts = [chunk["text"] for chunk in chunks]
+        vectors = lookup_chunk_vectors(texts)
+    return _group(doc_ids, texts, np.asarray(vectors, dtype=np.float32))
+
+def embed_job_texts(job_texts: List[str]) -> DocumentChunks:
+    """
+    Chunk and embed ad-hoc postings, keyed ``job-<position in job_texts>``
+    (identical postings stay separate). Known chunks come from the chunk
+    store; the rest are encoded without being written to it.
+    """
+    doc_ids, texts = [], []
+    for position, job_text in enumerate(job_texts):
+        chunks = split_text(job_text)
+        doc_ids.extend([f"job-{position}"] * len(chunks))
+        texts.extend(chunks)
+    if not texts:
+        return {}
+    return _group(doc_ids, texts, lookup_chunk_vectors(texts))
+
+def score_jobs(resume_vectors: np.ndarray, jobs: DocumentChunks, top_pairs: int = 3) -> List[dict]:
+    """
+    Rank jobs by how well the resume covers them.
+
+    One (resume chunks x all job chunks) similarity matrix is computed; each
+    job chunk takes its best-matching resume chunk (max-sim), and a job's
+    score is the mean over its chunks, so every requirement counts.
+    """
+    if not jobs or len(resume_vectors) == 0:
+        return []
+    job_ids = list(jobs)
+    counts = np.array([len(jobs[job_id][0]) for job_id in job_ids])
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    job_matrix = np.vstack([jobs[job_id][1] for job_id in job_ids])
+
+    similarity = resume_vectors @ job_matrix.T  # (resume chunks, job chunks)
+    best_resume = similarity.argmax(axis=0)
+    best_score = similarity[best_resume, np.arange(similarity.shape[1])]
+    scores = np.add.reduceat(best_score, starts) / counts
+
+    results = []
+    for j in np.argsort(-scores):
+        start, count = starts[j], counts[j]
+        columns = np.argsort(-best_score[start:start + count])[:top_pairs]
+        results.append({
+            "job_id": job_ids[j],
+            "score": round(float(scores[j]), 4),
+            "chunks": int(count),
+            "top_pairs": [
+                {
+                    "similarity": round(float(best_score[start + c]), 4),
+                    "resume_chunk": int(best_resume[start + c]),
+                    "job_chunk": jobs[job_ids[j]][0][c],
+                }
+                for c in columns
+            ],
+        })
+    return results
+
+def match_jobs(user_id: Optional[int] = None, job_texts: Optional[List[str]] = None,
+               top_k: int = 10, top_pairs: int = 3) -> dict:
+    """Rank the user's stored postings (or ``job_texts``) against their resume without any LLM calls."""
+    start = time.perf_counter()
+    resumes = load_document_chunks("resume", user_id)
+    if not resumes:
+        raise ValueError("No resume found. Please upload a resume first.")
+    resume_texts, resume_vectors = resumes.get("resume") or next(iter(resumes.values()))
+    jobs = embed_job_texts(job_texts) if job_texts else load_document_chunks(POSTINGS_INDEX, user_id)
+    loaded = time.perf_counter()
+
+    ranked = score_jobs(resume_vectors, jobs, top_pairs)[:top_k]
+    for result in ranked:
+        if job_texts:
+            result["job_index"] = int(result["job_id"].split("-", 1)[1])
+        for pair in result["top_pairs"]:
+            pair["resume_chunk"] = resume_texts[pair["resume_chunk"]]
+    finished = time.perf_counter()
+    logger.info(f"Matched {len(jobs)} jobs against {len(resume_texts)} resume chunks "
+                f"in {(finished - loaded) * 1000:.1f} ms (load {(loaded - start) * 1000:.1f} ms)")
+    return {
+        "jobs_scored": len(jobs),
+        "matches": ranked,
+        "load_ms": round((loaded - start) * 1000, 2),
+        "score_ms": round((finished - loaded) * 1000, 2),
+    }
@@ -0,0 +1,160 @@
+import base64
+import hashlib
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+from sqlalchemy import cast, func, select, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, insert
+from sqlalchemy.orm import Session
+from app.models.job_posting import JobPosting
+from app.models.job_posting_schemas import JobPostingCreate
+import logging
+
+logger = logging.getLogger(__name__)
+
+def content_hash(posting: JobPostingCreate) -> str:
+    """Hash of the posting with case and whitespace normalized, so trivial re-formatting is still a duplicate."""
+    digest = hashlib.sha256()
+    for value in (posting.title, posting.company, posting.location or "", posting.description):
+        digest.update(" ".join(value.lower().split()).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def encode_cursor(posting: JobPosting, rank: Optional[float] = None) -> str:
+    """Cursor after ``posting``: its (created_at, id), or (rank, id) for full-text searches."""
+    first = repr(rank) if rank is not None else posting.created_at.isoformat()
+    raw = f"{first}|{posting.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str, ranked: bool = False) -> Tuple[Union[datetime, float], int]:
+    try:
+        first, posting_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return (float(first) if ranked else datetime.fromisoformat(first)), int(posting_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def store_postings(db: Session, user_id: int, postings: List[JobPostingCreate]) -> dict:
+    """
+    Insert postings idempotently by content hash.
+
+    One INSERT ... ON CONFLICT DO NOTHING RETURNING per batch; postings
+    whose hash already exists for the user are looked up and reported
+    as existing instead of being duplicated.
+    """
+    rows = {}
+    for posting in postings:
+        posting_hash = content_hash(posting)
+        rows.setdefault(posting_hash, {**posting.model_dump(), "user_id": user_id, "content_hash": posting_hash})
+
+    statement = (
+        insert(JobPosting)
+        .values(list(rows.values()))
+        .on_conflict_do_nothing(index_elements=[JobPosting.user_id, JobPosting.content_hash])
+        .returning(JobPosting.id, JobPosting.content_hash)
+    )
+    created = {hash_: posting_id for posting_id, hash_ in db.execute(statement)}
+    existing_hashes = [hash_ for hash_ in rows if hash_ not in created]
+    existing = {}
+    if existing_hashes:
+        existing = {
+            hash_: posting_id for posting_id, hash_ in db.execute(
+                select(JobPosting.id, JobPosting.content_hash)
+                .where(JobPosting.user_id == user_id, JobPosting.content_hash.in_(existing_hashes))
+            )
+        }
+    db.commit()
+
+    logger.info(f"Stored {len(created)} new job postings for user {user_id} ({len(existing)} already present)")
+    return {
+        "created": len(created),
+        "existing": len(existing),
+        "duplicates_in_request": len(postings) - len(rows),
+        "created_ids": list(created.values()),
+        "ids": [created.get(hash_) or existing.get(hash_) for hash_ in rows],
+    }
+
+def search_postings(db: Session, user_id: int, q: Optional[str] = None, company: Optional[str] = None,
+                    title: Optional[str] = None, location: Optional[str] = None, limit: int = 20,
+                    cursor: Optional[str] = None) -> Tuple[List[JobPosting], Optional[str]]:
+    """
+    One page of a user's postings, optionally full-text searched and filtered.
+
+    With ``q`` results are ordered by ts_rank_cd (title matches weigh most),
+    otherwise newest first. Pagination is keyset-based on (rank, id) or
+    (created_at, id), so deep pages cost the same as the first one; pass the
+    returned cursor to get the next page.
+    """
+    if q:
+        query = func.websearch_to_tsquery("english", q)
+        # Double precision so the rank round-trips exactly through the cursor
+        rank = cast(func.ts_rank_cd(JobPosting.search_vector, query), DOUBLE_PRECISION)
+        statement = select(JobPosting, rank).where(JobPosting.search_vector.op("@@")(query))
+        sort_key = (rank, JobPosting.id)
+    else:
+        statement = select(JobPosting)
+        sort_key = (JobPosting.created_at, JobPosting.id)
+    statement = statement.where(JobPosting.user_id == user_id)
+    if company:
+        statement = statement.where(func.lower(JobPosting.company) == company.lower())
+    if title:
+        statement = statement.where(func.lower(JobPosting.title) == title.lower())
+    if location:
+        statement = statement.where(func.lower(JobPosting.location) == location.lower())
+    if cursor:
+        statement = statement.where(tuple_(*sort_key) < tuple_(*decode_cursor(cursor, ranked=bool(q))))
+    statement = statement.order_by(*(column.desc() for column in sort_key)).limit(limit + 1)
+
+    if q:
+        rows = db.execute(statement).all()
+        postings, ranks = [row[0] for row in rows], [row[1] for row in rows]
+    else:
+        postings, ranks = list(db.scalars(statement)), None
+    next_cursor = None
+    if len(postings) > limit:
+        next_cursor = encode_cursor(postings[limit - 1], ranks[limit - 1] if ranks else None)
+    return postings[:limit], next_cursor
+
+def get_posting(db: Session, user_id: int, posting_id: int) -> Optional[JobPosting]:
+    return db.scalars(
+        select(JobPosting).where(JobPosting.user_id == user_id, JobPosting.id == posting_id)
+    ).first()
+
+def get_postings(db: Session, user_id: int, posting_ids: List[int]) -> List[JobPosting]:
+    return list(db.scalars(
+        select(JobPosting).where(JobPosting.user_id == user_id, JobPosting.id.in_(posting_ids))
+    ))
+
+def index_posting_vectors(postings: List[JobPosting], user_id: int) -> dict:
+    """
+    Chunk and embed postings into the user's postings index as ``posting-<id>``
+    documents, in one batched pass; postings already indexed are skipped.
+    """
+    from app.ai.vectorstore import user_index_name
+    from app.services.document_ingestion import replace_documents
+    from app.services.job_ingestion import POSTINGS_INDEX
+    from app.utils.text_splitter import split_text
+
+    documents = []
+    for posting in postings:
+        chunks = split_text(f"{posting.title} at {posting.company}\n{posting.description}")
+        metadata = {"source": "posting", "posting_id": posting.id, "title": posting.title, "company": posting.company}
+        documents.append((f"posting-{posting.id}", chunks, [metadata] * len(chunks)))
+    result = replace_documents(user_index_name(POSTINGS_INDEX, user_id), documents)
+    return {
+        "postings_indexed": sum(1 for document in result["documents"].values() if not document["unchanged"]),
+        "postings_unchanged": sum(1 for document in result["documents"].values() if document["unchanged"]),
+        "chunks_indexed": result["chunks_indexed"],
+        "chunks_embedded": result["chunks_embedded"],
+    }
+
+def index_stored_postings(user_id: int, posting_ids: List[int], progress=None) -> dict:
+    """Ingestion queue task: load the user's postings by id in a fresh session and index their vectors."""
+    from app.models.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        postings = get_postings(db, user_id, posting_ids)
+    finally:
+        db.close()
+    if progress:
+        progress("embedding", 0.2)
+    return index_posting_vectors(postings, user_id)
@@ -1,17 +1,111 @@
-from typing import Optional, List
-from app.ai.chains import generate_recruiter_email
-from app.ai.retriever import get_retriever
+from typing import Optional, List, Tuple, AsyncIterator
+from app.ai.chains import generate_recruiter_email, agenerate_recruiter_email, astream_recruiter_email
+from app.ai.retriever import get_retriever, RetrievalContext, build_retrieval_context, abuild_retrieval_context
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+class EmailStreamParser:
+    """
+    Incrementally split streamed LLM output into subject lines and email body.
+
+    Text is fed as it arrives; each completed line is classified immediately,
+    so subject lines are known before the email body has finished generating.
+    """
+
+    def __init__(self, role: str = "", company: str = ""):
+        self.role = role
+        self.company = company
+        self.subject_lines: List[str] = []
+        self.email_body_lines: List[str] = []
+        self._in_subjects = True
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """Consume a chunk of text; return ("subject" | "body", line) events for completed lines."""
+        self._buffer += text
+        events = []
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            event = self._consume_line(line)
+            if event:
+                events.append(event)
+        return events
+
+    def close(self) -> List[Tuple[str, str]]:
+        """Flush the trailing partial line once the stream has ended."""
+        line, self._buffer = self._buffer, ""
+        event = self._consume_line(line)
+        return [event] if event else []
+
+    def _consume_line(self, line: str) -> Optional[Tuple[str, str]]:
+        line = line.strip()
+        if not line:
+            return None
+            
+        # Look for subject line patterns
+        if self._in_subjects and (
+            line.startswith("Subject:") or 
+            line.startswith("1.") or 
+            line.startswith("2.") or 
+            line.startswith("3.") or
+            "subject" in line.lower()
+        ):
+            # Extract subject line text
+            subject = re.sub(r'^(Subject:|[123]\.|Subject\s*\d+:)', '', line).strip()
+            if subject:
+                self.subject_lines.append(subject)
+                return ("subject", subject)
+            return None
+
+        self._in_subjects = False
+        self.email_body_lines.append(line)
+        return ("body", line)
+
+    def result(self) -> dict:
+        subject_lines = self.subject_lines
+        # If no subjects found, generate defaults
+        if not subject_lines:
+            subject_lines = [
+                f"Interested in {self.role} role at {self.company}",
+                f"Quick chat about {self.role} opportunity?",
+                f"Perfect fit for your {self.role} position"
+            ]
+        
+        return {
+            'subject_lines': subject_lines[:3],  # Max 3 subject lines
+            'email_body': '\n'.join(self.email_body_lines)
+        }
+
+
 class RecruiterEmailService:
-    def __init__(self):
-        self.resume_retriever = get_retriever(index_name="resume")
-        self.job_retriever = get_retriever(index_name="job")
+    def __init__(self, user_id: Optional[int] = None):
+        self.user_id = user_id
+        self._resume_retriever = None
+        self._job_retriever = None
+
+    @property
+    def resume_retriever(self):
+        if self._resume_retriever is None:
+            self._resume_retriever = get_retriever(index_name="resume", user_id=self.user_id)
+        return self._resume_retriever
 
-    def generate(self, role: str, company: str, recruiter_name: Optional[str] = None) -> dict:
+    @property
+    def job_retriever(self):
+        if self._job_retriever is None:
+            self._job_retriever = get_retriever(index_name="job", user_id=self.user_id)
+        return self._job_retriever
+
+    def build_context(self) -> RetrievalContext:
+        """Retrieve resume and job context once for both validation and generation."""
+        return build_retrieval_context(user_id=self.user_id)
+
+    async def abuild_context(self) -> RetrievalContext:
+        return await abuild_retrieval_context(user_id=self.user_id)
+
+    def generate(self, role: str, company: str, recruiter_name: Optional[str] = None,
+                 context: Optional[RetrievalContext] = None, force_regenerate: bool = False) -> dict:
         """
         Generate a recruiter outreach email with subject lines.
         
@@ -19,23 +113,18 @@ class RecruiterEmailService:
             role: Job title/position
             company: Company name  
             recruiter_name: Optional recruiter name for personalization
+            context: Pre-retrieved context; retrieved on demand if omitted
+            force_regenerate: Skip the response cache and call the LLM
             
         Returns:
             Dict with 'subject_lines' (list) and 'email_body' (str)
         """
         try:
             logger.info(f"Generating recruiter email for {role} at {company}")
-            raw_content = generate_recruiter_email(role, company)
-            parsed = self._parse_email_content(raw_content)
-            
-            # Add personalization if recruiter name provided
-            if recruiter_name:
-                parsed['email_body'] = parsed['email_body'].replace(
-                    "Hi there,", f"Hi {recruiter_name},"
-                ).replace(
-                    "Hello,", f"Hello {recruiter_name},"
-                )
-            
+            if context is None:
+                context = self.build_context()
+            raw_content = generate_recruiter_email(role, company, context, force_regenerate)
+            parsed = self._finalize(raw_content, role, company, recruiter_name)
             logger.info("Recruiter email generated successfully")
             return parsed
             
@@ -43,48 +132,63 @@ class RecruiterEmailService:
             logger.error(f"Error generating recruiter email: {str(e)}")
             raise
 
-    def _parse_email_content(self, content: str) -> dict:
-        """Parse the LLM output to extract subject lines and email body."""
-        lines = content.strip().split('\n')
-        subject_lines = []
-        email_body_lines = []
-        
-        in_subjects = True
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Look for subject line patterns
-            if in_subjects and (
-                line.startswith("Subject:") or 
-                line.startswith("1.") or 
-                line.startswith("2.") or 
-                line.startswith("3.") or
-                "subject" in line.lower()
-            ):
-                # Extract subject line text
-                subject = re.sub(r'^(Subject:|[123]\.|Subject\s*\d+:)', '', line).strip()
-                if subject:
-                    subject_lines.append(subject)
-            else:
-                in_subjects = False
-                email_body_lines.append(line)
-        
-        # If no subjects found, generate defaults
-        if not subject_lines:
-            subject_lines = [
-                f"Interested in {role} role at {company}",
-                f"Quick chat about {role} opportunity?",
-                f"Perfect fit for your {role} position"
-            ]
-        
-        email_body = '\n'.join(email_body_lines)
+    async def agenerate(self, role: str, company: str, recruiter_name: Optional[str] = None,
+                        context: Optional[RetrievalContext] = None, force_regenerate: bool = False) -> dict:
+        """Async variant of generate that does not block the event loop."""
+        try:
+            logger.info(f"Generating recruiter email for {role} at {company}")
+            if context is None:
+                context = await self.abuild_context()
+            raw_content = await agenerate_recruiter_email(role, company, context, force_regenerate)
+            parsed = self._finalize(raw_content, role, company, recruiter_name)
+            logger.info("Recruiter email generated successfully")
+            return parsed
+        except Exception as e:
+            logger.error(f"Error generating recruiter email: {str(e)}")
+            raise
+
+    async def astream(self, role: str, company: str, recruiter_name: Optional[str] = None,
+                      context: Optional[RetrievalContext] = None,
+                      force_regenerate: bool = False) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Stream a recruiter email as ("token" | "subject", str) events while the
+        LLM generates, then a final ("result", dict) with the parsed email.
+        """
+        logger.info(f"Streaming recruiter email for {role} at {company}")
+        if context is None:
+            context = await self.abuild_context()
+        parser = EmailStreamParser(role, company)
+        chunks = []
+        async for token in astream_recruiter_email(role, company, context, force_regenerate):
+            chunks.append(token)
+            yield ("token", token)
+            for kind, line in parser.feed(token):
+                if kind == "subject":
+                    yield ("subject", line)
+        for kind, line in parser.close():
+            if kind == "subject":
+                yield ("subject", line)
+        yield ("result", self._finalize("".join(chunks), role, company, recruiter_name))
+        logger.info("Recruiter email streamed successfully")
+
+    def _finalize(self, raw_content: str, role: str, company: str, recruiter_name: Optional[str] = None) -> dict:
+        parsed = self._parse_email_content(raw_content, role, company)
         
-        return {
-            'subject_lines': subject_lines[:3],  # Max 3 subject lines
-            'email_body': email_body
-        }
+        # Add personalization if recruiter name provided
+        if recruiter_name:
+            parsed['email_body'] = parsed['email_body'].replace(
+                "Hi there,", f"Hi {recruiter_name},"
+            ).replace(
+                "Hello,", f"Hello {recruiter_name},"
+            )
+        return parsed
+
+    def _parse_email_content(self, content: str, role: str = "", company: str = "") -> dict:
+        """Parse the LLM output to extract subject lines and email body."""
+        parser = EmailStreamParser(role, company)
+        parser.feed(content)
+        parser.close()
+        return parser.result()
 
     def get_achievements_context(self, k: int = 3) -> List[str]:
         """Extract key achievements from resume for email highlights."""
@@ -106,11 +210,13 @@ class RecruiterEmailService:
             logger.error(f"Error extracting achievements: {str(e)}")
             return []
 
-    def validate_context(self, role: str, company: str) -> bool:
+    def validate_context(self, role: str, company: str, context: Optional[RetrievalContext] = None) -> bool:
         """Validate that we have sufficient context for email generation."""
         try:
-            resume_docs = self.resume_retriever.get_relevant_documents("experience skills")
-            job_docs = self.job_retriever.get_relevant_documents("requirements")
+            if context is None:
+                context = self.build_context()
+            resume_docs = context.resume_docs
+            job_docs = context.job_docs
             
             if not resume_docs:
                 logger.warning("No resume context available")
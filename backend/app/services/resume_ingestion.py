@@ -1,45 +1,73 @@
-from app.ai.vectorstore import get_vectorstore
-from app.utils.pdf_parser import extract_text_from_pdf
-from app.utils.text_splitter import split_text
+from app.ai.vectorstore import user_index_name
+from typing import Callable, Optional
+from app.services.document_ingestion import replace_document
+from app.utils.pdf_parser import iter_pdf_pages, PdfSource
+from app.utils.text_splitter import iter_chunks
+from app.ai.chunk_embeddings import embed_chunks
+from app.core.concurrency import iterate_in_background
+from app.core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-def process_and_store_resume(file_path: str, index_name="resume"):
-    text = extract_text_from_pdf(file_path)
-    chunks = split_text(text)
-    
-    if not chunks:  # Handle empty document
-        chunks = ["No extractable text found"]
-    
-    vectorstore = get_vectorstore(index_name=index_name)
-    
-    # Clear existing resume chunks before adding new ones
-    # This ensures we only use the most recent resume
-    try:
-        # Get all existing documents to clear them
-        existing_docs = vectorstore.get()
-        if existing_docs and hasattr(existing_docs, 'documents') and existing_docs.documents:
-            # Delete all existing documents
-            doc_ids = [doc.metadata.get('id', str(i)) for i, doc in enumerate(existing_docs.documents)]
-            if doc_ids:
-                vectorstore.delete(doc_ids)
-                logger.info(f"Cleared {len(doc_ids)} existing resume chunks")
-    except Exception as e:
-        logger.warning(f"Could not clear existing resume chunks: {e}")
-        # If clearing fails, try to delete by content (fallback)
-        try:
-            vectorstore.delete(["Initial document", "dummy", "No extractable text found"])
-        except:
-            pass
+def process_and_store_resume(source: PdfSource, index_name="resume", user_id: Optional[int] = None,
+                             progress: Optional[Callable[[str, float], None]] = None):
+    """
+    Parse, chunk and index a resume PDF given as a file path or in-memory bytes.
+
+    ``progress(stage, fraction)`` is called between stages when provided
+    (used by the background ingestion queue).
+    """
+    progress = progress or (lambda stage, fraction: None)
+    index_name = user_index_name(index_name, user_id)
+    # Parse pages and chunk them on a helper thread while this thread embeds
+    # full batches, so parsing, splitting and embedding overlap.
+    progress("parsing", 0.1)
+    pages = []
+    def page_texts():
+        for page in iter_pdf_pages(source):
+            pages.append(page)
+            yield page.number, page.text
+
+    embedded = {"chunks_reused": 0, "chunks_embedded": 0}
+    def embed(texts):
+        _, report = embed_chunks(texts)
+        for key in embedded:
+            embedded[key] += report[key]
+
+    chunks = []
+    batch = []
+    for chunk in iterate_in_background(iter_chunks(page_texts())):
+        chunks.append(chunk)
+        batch.append(chunk.text)
+        if len(batch) >= settings.EMBEDDING_BATCH_SIZE:
+            progress("embedding", 0.3)
+            embed(batch)
+            batch = []
+    if batch:
+        embed(batch)
+
+    parse_seconds = sum(page.seconds for page in pages)
+    slowest = sorted(pages, key=lambda page: page.seconds, reverse=True)[:3]
+    logger.info(f"Parsed {len(pages)} pages in {parse_seconds:.3f}s into {len(chunks)} chunks")
     
-    # Add new resume chunks
-    vectorstore.add_texts(chunks)
+    texts = [chunk.text for chunk in chunks]
+    metadatas = [chunk.metadata for chunk in chunks]
+    if not texts:  # Handle empty document
+        texts = ["No extractable text found"]
+        metadatas = None
     
-    # Save if FAISS
-    try:
-        from app.persistence.faiss_client import save_faiss_vectorstore
-        save_faiss_vectorstore(vectorstore, index_name=index_name)
-    except ImportError:
-        pass
-    return {"chunks_indexed": len(chunks)}
+    # Replace the previous resume rather than accumulating chunks;
+    # embeddings computed above are reused from the chunk store
+    progress("indexing", 0.5)
+    result = replace_document(index_name, "resume", texts, metadatas=metadatas)
+    if chunks:
+        # The model ran during parsing; replace_document only saw chunk store hits
+        result["chunks_reused"] = embedded["chunks_reused"]
+        result["chunks_embedded"] += embedded["chunks_embedded"]
+    result["parse"] = {
+        "pages": len(pages),
+        "seconds": round(parse_seconds, 4),
+        "slowest_pages": [{"page": page.number + 1, "seconds": round(page.seconds, 4)} for page in slowest],
+    }
+    return result
@@ -0,0 +1,132 @@
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.password_hashing import hash_passwords
+from app.models.auth_schemas import UserCreate
+from app.models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_FIELDS = ("email", "username")
+
+class UserConflictError(Exception):
+    """Raised when a unique user field (email or username) is already taken."""
+
+    def __init__(self, field: Optional[str]):
+        self.field = field
+        super().__init__(f"{field or 'user'} already exists")
+
+def conflicting_field(error: IntegrityError) -> Optional[str]:
+    """
+    Which unique field an insert collided on, read from the database error.
+
+    Postgres reports the constraint name and ``Key (email)=(...)`` detail;
+    SQLite reports ``UNIQUE constraint failed: users.email``.
+    """
+    orig = getattr(error, "orig", None)
+    diag = getattr(orig, "diag", None)
+    candidates = [getattr(diag, "constraint_name", None), getattr(diag, "message_detail", None), str(orig)]
+    for text in candidates:
+        if not text:
+            continue
+        for field in UNIQUE_FIELDS:
+            if f"({field})" in text or f".{field}" in text or f"_{field}" in text:
+                return field
+    return None
+
+def create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """
+    Insert a user in a single round trip, letting the unique constraints
+    detect duplicates (no pre-check SELECTs, no race between sign-ups).
+    """
+    statement = insert(User).values(
+        email=user.email,
+        username=user.username,
+        full_name=user.full_name,
+        hashed_password=hashed_password
+    ).returning(User)
+    try:
+        # RETURNING brings back server-generated columns, so no refresh SELECT is needed
+        db_user = db.scalars(statement).one()
+        db.expunge(db_user)  # keep the loaded attributes; commit would expire them
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise UserConflictError(conflicting_field(e))
+    return db_user
+
+def read_user_records(path: Path) -> Iterator[dict]:
+    """Yield user dicts from a CSV (with a header row) or JSONL file."""
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(handle)
+
+def _insert_batch(db: Session, rows: List[dict]) -> List[str]:
+    """Insert ``rows`` with one statement, skipping conflicts; returns the emails actually inserted."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise ValueError(f"Bulk user import is not supported on {dialect}")
+    statement = dialect_insert(User).values(rows).on_conflict_do_nothing().returning(User.email)
+    inserted = [email for (email,) in db.execute(statement)]
+    db.commit()
+    return inserted
+
+def import_users(db: Session, records: Iterable[dict], batch_size: int = 500) -> dict:
+    """
+    Bulk-create users (onboarding cohorts).
+
+    Rows are validated with UserCreate, de-duplicated within the file, hashed
+    in parallel on the password hashing pool and inserted ``batch_size`` at a
+    time with ON CONFLICT DO NOTHING, so re-running an import is safe.
+    """
+    report = {"inserted": 0, "skipped_existing": [], "duplicates_in_file": [], "invalid": []}
+    seen: Dict[str, set] = {field: set() for field in UNIQUE_FIELDS}
+    batch: List[UserCreate] = []
+
+    def flush():
+        hashes = hash_passwords([user.password for user in batch])
+        rows = [
+            {"email": user.email, "username": user.username, "full_name": user.full_name,
+             "hashed_password": hashed}
+            for user, hashed in zip(batch, hashes)
+        ]
+        inserted = set(_insert_batch(db, rows))
+        report["inserted"] += len(inserted)
+        report["skipped_existing"].extend(row["email"] for row in rows if row["email"] not in inserted)
+        batch.clear()
+
+    for line, record in enumerate(records, 1):
+        try:
+            user = UserCreate(**record)
+        except ValidationError as e:
+            report["invalid"].append({"line": line, "error": e.errors()[0]["msg"]})
+            continue
+        keys = {"email": user.email.lower(), "username": user.username.lower()}
+        if any(keys[field] in seen[field] for field in UNIQUE_FIELDS):
+            report["duplicates_in_file"].append(user.email)
+            continue
+        for field in UNIQUE_FIELDS:
+            seen[field].add(keys[field])
+        batch.append(user)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    logger.info(f"Imported {report['inserted']} users ({len(report['skipped_existing'])} existing, "
+                f"{len(report['duplicates_in_file'])} duplicates, {len(report['invalid'])} invalid)")
+    return report
@@ -1,5 +1,75 @@
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+@lru_cache(maxsize=8)
+def get_splitter(chunk_size=1000, chunk_overlap=100) -> RecursiveCharacterTextSplitter:
+    """Splitters are stateless, so one instance per configuration is shared."""
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True)
+
 def split_text(text: str, chunk_size=1000, chunk_overlap=100):
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    return splitter.split_text(text)
+    return get_splitter(chunk_size, chunk_overlap).split_text(text)
+
+class TextChunk(NamedTuple):
+    text: str
+    page: int  # page (0-based) where the chunk starts
+    page_end: int  # page where the chunk ends
+    start: int  # character offset in the whole document
+    end: int
+
+    @property
+    def metadata(self) -> dict:
+        return {"page": self.page + 1, "page_end": self.page_end + 1, "start": self.start, "end": self.end}
+
+def iter_chunks(pages: Iterable[Tuple[int, str]], chunk_size=1000, chunk_overlap=100) -> Iterator[TextChunk]:
+    """
+    Chunk a document incrementally as its ``(page_number, text)`` pages arrive.
+
+    Once the buffer holds two chunks' worth of text, all but the last chunk
+    are emitted; the last (possibly incomplete) one is held back, together
+    with up to ``chunk_overlap`` characters before it, and re-split with the
+    next page. Chunks and their overlap therefore span page boundaries.
+    """
+    splitter = get_splitter(chunk_size, chunk_overlap)
+    buffer = ""
+    buffer_offset = 0  # document offset of buffer[0]
+    page_starts: List[int] = []
+    page_numbers: List[int] = []
+    document_length = 0
+
+    def page_at(offset: int) -> int:
+        return page_numbers[max(bisect_right(page_starts, offset) - 1, 0)]
+
+    def make_chunk(doc) -> TextChunk:
+        start = buffer_offset + doc.metadata["start_index"]
+        end = start + len(doc.page_content)
+        return TextChunk(doc.page_content, page_at(start), page_at(max(end - 1, start)), start, end)
+
+    for number, text in pages:
+        page_starts.append(document_length)
+        page_numbers.append(number)
+        document_length += len(text)
+        buffer += text
+        # Wait until there is enough text that the leading chunks are final
+        if len(buffer) < chunk_size * 2:
+            continue
+
+        docs = splitter.create_documents([buffer])
+        if len(docs) < 2:
+            continue
+        for doc in docs[:-1]:
+            yield make_chunk(doc)
+
+        # Keep the held-back chunk plus up to chunk_overlap chars before it, starting on a word
+        held_start = docs[-1].metadata["start_index"]
+        keep_from = max(held_start - chunk_overlap, docs[-2].metadata["start_index"] + 1)
+        space = buffer.find(" ", keep_from, held_start)
+        keep_from = space + 1 if space != -1 else held_start
+        buffer = buffer[keep_from:]
+        buffer_offset += keep_from
+
+    if buffer.strip():
+        docs = splitter.create_documents([buffer])
+        for doc in docs:
+            yield make_chunk(doc)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Authenticated-endpoint load test: p50/p99 of GET /auth/me under concurrency
+and the database user lookups it caused (from /metrics user_cache stats)
+
+Run it against a server started with AUTH_USER_CACHE_SIZE=0 and again with
+the cache enabled to compare.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+async def run(base_url: str, requests: int, concurrency: int):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        suffix = uuid.uuid4().hex[:8]
+        email, password = f"loadtest-{suffix}@example.com", "loadtest-password"
+        await client.post("/auth/register", json={"email": email, "username": f"loadtest-{suffix}",
+                                                  "full_name": "Load Test", "password": password})
+        login = await client.post("/auth/login", json={"email": email, "password": password})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        before = (await client.get("/metrics")).json().get("user_cache")
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, failures = [], 0
+
+        async def one():
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/auth/me", headers=headers)
+                if response.status_code != 200:
+                    failures += 1
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+        after = (await client.get("/metrics")).json().get("user_cache")
+
+    latencies.sort()
+    pick = lambda q: latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+    print(f"requests: {requests}  concurrency: {concurrency}  failed: {failures}")
+    print(f"throughput: {requests / elapsed:.1f} req/s")
+    print(f"p50: {pick(0.50):.1f} ms  p95: {pick(0.95):.1f} ms  p99: {pick(0.99):.1f} ms")
+    if before is not None and after is not None:
+        print(f"user DB lookups: {after['db_lookups'] - before['db_lookups']} (cache hit rate {after['hit_rate']})")
+    else:
+        print(f"user cache disabled: every request ran one user lookup ({requests})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print("🔐 AUTH LOAD TEST")
+    print("=" * 40)
+    asyncio.run(run(args.url, args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Retrieval benchmark: recall@k and query latency of dense-only vs. hybrid
+(BM25 + dense, reciprocal rank fusion) search on synthetic resume chunks
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+SKILLS = (
+    "Kubernetes PySpark Terraform Airflow Snowflake GraphQL Kafka Rust Golang Elasticsearch "
+    "Cassandra Flink dbt Jenkins Prometheus Grafana Ansible Redis PostgreSQL TensorFlow"
+).split()
+FILLER = (
+    "led team built pipeline reduced latency improved revenue designed shipped mentored engineers "
+    "migrated platform scaled services customers analytics owned roadmap partnered stakeholders"
+).split()
+
+def make_corpus(count: int, seed: int = 0):
+    """Chunks of filler text that each mention one or two skills."""
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(40, 120))]
+        for skill in rng.sample(SKILLS, rng.randint(1, 2)):
+            words.insert(rng.randrange(len(words)), skill)
+        chunks.append(" ".join(words))
+    return chunks
+
+def recall_at_k(results, relevant, k):
+    return len({doc.page_content for doc in results[:k]} & relevant) / min(len(relevant), k)
+
+def run(chunks, k, queries_per_skill):
+    from langchain_community.vectorstores import FAISS
+    from app.ai.embeddings import get_embeddings
+    from app.ai.hybrid_retriever import reciprocal_rank_fusion
+    from app.core.config import settings
+    from app.persistence import keyword_index
+
+    vectorstore = FAISS.from_texts(chunks, get_embeddings())
+    keyword_index.KEYWORD_INDEX_DIR = Path(tempfile.mkdtemp())
+    index = keyword_index.get_keyword_index("benchmark")
+    index.add([str(i) for i in range(len(chunks))], chunks)
+
+    templates = ["experience with {}", "{} projects", "hands-on {} work"]
+    totals = {"dense": [0.0, 0.0], "hybrid": [0.0, 0.0]}
+    queries = 0
+    for skill in SKILLS:
+        relevant = {chunk for chunk in chunks if skill in chunk.split()}
+        for template in templates[:queries_per_skill]:
+            query = template.format(skill)
+            queries += 1
+
+            start = time.perf_counter()
+            dense = vectorstore.similarity_search(query, k=max(k, settings.HYBRID_FETCH_K))
+            dense_seconds = time.perf_counter() - start
+            sparse = [doc for doc, _ in index.search(query, k=max(k, settings.HYBRID_FETCH_K))]
+            hybrid = reciprocal_rank_fusion([dense, sparse], k, settings.HYBRID_RRF_K)
+            hybrid_seconds = time.perf_counter() - start
+
+            totals["dense"][0] += recall_at_k(dense, relevant, k)
+            totals["dense"][1] += dense_seconds
+            totals["hybrid"][0] += recall_at_k(hybrid, relevant, k)
+            totals["hybrid"][1] += hybrid_seconds
+
+    print(f"{'path':>8} {'recall@' + str(k):>10} {'ms/query':>10}")
+    for path, (recall, seconds) in totals.items():
+        print(f"{path:>8} {recall / queries:>10.3f} {seconds / queries * 1000:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--queries-per-skill", type=int, default=3)
+    args = parser.parse_args()
+
+    print("🔎 RETRIEVAL BENCHMARK")
+    print("=" * 40)
+    run(make_corpus(args.chunks), args.k, args.queries_per_skill)
+
+if __name__ == "__main__":
+    main()
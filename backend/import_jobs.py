@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Bulk job description import into a user's postings index
+
+Reads a JSONL file (one {"description": ...} object per line, with optional
+title and company) or a directory of .txt files, one posting per file.
+Postings are keyed by content, so an import can be re-run.
+"""
+import argparse
+import json
+import sys
+import os
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.services.job_ingestion import store_job_descriptions_bulk
+
+def read_job_texts(path: Path):
+    if path.is_dir():
+        return [file.read_text(encoding="utf-8") for file in sorted(path.glob("*.txt"))]
+    job_texts = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            header = " at ".join(record[key] for key in ("title", "company") if record.get(key))
+            job_texts.append(f"{header}\n{record['description']}" if header else record["description"])
+    return job_texts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", type=Path, help="JSONL file or directory of .txt files")
+    parser.add_argument("--user-id", type=int, required=True, help="Owner of the postings index")
+    args = parser.parse_args()
+
+    job_texts = [text for text in read_job_texts(args.path) if text.strip()]
+    report = store_job_descriptions_bulk(job_texts, user_id=args.user_id)
+    print(f"Indexed {report['jobs_indexed']} job descriptions")
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Bulk user import for onboarding cohorts
+
+Reads a CSV (header: email,username,full_name,password) or JSONL file with
+the same fields. Existing users are skipped, so an import can be re-run.
+"""
+import argparse
+import json
+import sys
+import os
+from pathlib import Path
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.models.database import SessionLocal
+from app.services.user_service import import_users, read_user_records
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", type=Path, help="CSV or JSONL file")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = import_users(db, read_user_records(args.path), batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Inserted {report['inserted']} users")
+    print(json.dumps({key: value for key, value in report.items() if key != "inserted"}, indent=2))
+
+if __name__ == "__main__":
+    main()
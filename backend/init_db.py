@@ -9,6 +9,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.models import create_tables
+import app.models.job_posting  # noqa: F401 - register the job_postings table before create_tables
 from app.models.database import SessionLocal
 from app.models.user import User
 from app.core.auth import get_password_hash
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from app.persistence import chunk_store
+from app.persistence.chunk_store import ChunkEmbeddingStore
+
+
+def _vectors(*values):
+    return np.array([[v, v + 0.5, v + 1.0] for v in values], dtype=np.float32)
+
+
+def test_lookup_returns_added_rows(tmp_path):
+    store = ChunkEmbeddingStore(tmp_path)
+    store.add(["a", "b"], _vectors(1, 2))
+
+    found = store.lookup(["a", "b", "missing"])
+
+    assert set(found) == {"a", "b"}
+    np.testing.assert_array_equal(found["b"], _vectors(2)[0])
+
+
+def test_failed_hash_write_does_not_misalign_later_rows(tmp_path, monkeypatch):
+    store = ChunkEmbeddingStore(tmp_path)
+    store.add(["a"], _vectors(1))
+
+    real_open = open
+
+    def failing_open(path, mode="r", *args, **kwargs):
+        if path == store.hashes_path and "a" in mode:
+            raise OSError("disk full")
+        return real_open(path, mode, *args, **kwargs)
+
+    # Vectors for "b" reach disk, then the hash append fails
+    monkeypatch.setattr(chunk_store, "open", failing_open, raising=False)
+    with pytest.raises(OSError):
+        store.add(["b"], _vectors(2))
+    monkeypatch.undo()
+    assert store.vectors_path.stat().st_size == 2 * 3 * 4
+
+    store.add(["c"], _vectors(3))
+
+    assert store.vectors_path.stat().st_size == 2 * 3 * 4
+    found = store.lookup(["a", "b", "c"])
+    assert set(found) == {"a", "c"}
+    np.testing.assert_array_equal(found["a"], _vectors(1)[0])
+    np.testing.assert_array_equal(found["c"], _vectors(3)[0])
+    # A fresh reader (another worker) sees the same alignment
+    np.testing.assert_array_equal(ChunkEmbeddingStore(tmp_path).lookup(["c"])["c"], _vectors(3)[0])
+
+
+def test_partial_hash_line_is_discarded(tmp_path):
+    store = ChunkEmbeddingStore(tmp_path)
+    store.add(["a"], _vectors(1))
+    with open(store.vectors_path, "ab") as f:
+        f.write(_vectors(2).tobytes())
+    with open(store.hashes_path, "a") as f:
+        f.write("b-partial")
+
+    store.add(["c"], _vectors(3))
+
+    assert store.hashes_path.read_text().splitlines() == ["a", "c"]
+    np.testing.assert_array_equal(store.lookup(["c"])["c"], _vectors(3)[0])
+
+
+def test_reader_opened_before_first_write_sees_rows(tmp_path):
+    reader = ChunkEmbeddingStore(tmp_path)
+    ChunkEmbeddingStore(tmp_path).add(["a"], _vectors(1))
+
+    found = reader.lookup(["a"])
+
+    assert reader.dim == 3
+    np.testing.assert_array_equal(found["a"], _vectors(1)[0])
@@ -0,0 +1,35 @@
+import numpy as np
+from app.services.job_match_service import score_jobs
+
+
+def _jobs():
+    return {
+        "a": (["a0", "a1"], np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)),
+        "b": (["b0"], np.array([[0.6, 0.8]], dtype=np.float32)),
+        "c": (["c0", "c1"], np.array([[1.0, 0.0], [-1.0, 0.0]], dtype=np.float32)),
+    }
+
+
+def test_score_is_mean_of_best_resume_match_per_job_chunk():
+    resume_vectors = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    results = score_jobs(resume_vectors, _jobs())
+
+    assert [result["job_id"] for result in results] == ["a", "b", "c"]
+    assert [result["score"] for result in results] == [1.0, 0.8, 0.5]
+    assert [result["chunks"] for result in results] == [2, 1, 2]
+
+
+def test_top_pairs_are_best_job_chunks_with_their_resume_chunk():
+    resume_vectors = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+    results = {result["job_id"]: result for result in score_jobs(resume_vectors, _jobs(), top_pairs=1)}
+
+    assert results["c"]["top_pairs"] == [{"similarity": 1.0, "resume_chunk": 0, "job_chunk": "c0"}]
+    assert results["b"]["top_pairs"] == [{"similarity": 0.8, "resume_chunk": 1, "job_chunk": "b0"}]
+    assert len(score_jobs(resume_vectors, _jobs(), top_pairs=3)[0]["top_pairs"]) == 2
+
+
+def test_no_jobs_or_empty_resume_scores_nothing():
+    assert score_jobs(np.zeros((0, 2), dtype=np.float32), _jobs()) == []
+    assert score_jobs(np.eye(2, dtype=np.float32), {}) == []
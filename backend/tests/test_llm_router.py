@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import Runnable, RunnableLambda
+from app.ai.llm_factory import LatencyTracker, LLMRouter, RoutedProvider, RouterError, has_native_async
+from app.core.config import settings
+
+
+class FakeProvider(Runnable):
+    """Answers after ``delay`` seconds (or raises ``error``) and records whether it was cancelled."""
+
+    def __init__(self, name, delay, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    def invoke(self, input, config=None, **kwargs):
+        raise NotImplementedError
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return f"{self.name}: {input}"
+
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    # No latency samples yet, so every call hedges after the default delay
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_SAMPLES", 1000)
+    monkeypatch.setattr(settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY_SECONDS", 0.0)
+
+
+def _router(*fakes, native_async=True):
+    return LLMRouter([RoutedProvider(fake.name, fake, LatencyTracker(), native_async=native_async) for fake in fakes])
+
+
+def _ainvoke(router, prompt="hi"):
+    async def call():
+        result = await router.ainvoke(prompt)
+        await asyncio.sleep(0.01)  # let the loser's cancellation land
+        return result
+    return asyncio.run(call())
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary, secondary = FakeProvider("primary", 5.0), FakeProvider("secondary", 0.01)
+    router = _router(primary, secondary)
+
+    assert _ainvoke(router) == "secondary: hi"
+
+    assert primary.cancelled and not secondary.cancelled
+    assert router.stats == {"hedged": 1, "hedge_wins": 1, "fallbacks": 0}
+
+
+def test_fast_primary_is_not_hedged():
+    primary, secondary = FakeProvider("primary", 0.0), FakeProvider("secondary", 0.0)
+    router = _router(primary, secondary)
+
+    assert _ainvoke(router) == "primary: hi"
+
+    assert secondary.calls == 0
+    assert router.stats == {"hedged": 0, "hedge_wins": 0, "fallbacks": 0}
+
+
+def test_error_falls_back_to_next_provider():
+    primary = FakeProvider("primary", 0.0, error=RuntimeError("503"))
+    secondary = FakeProvider("secondary", 0.0)
+    router = _router(primary, secondary)
+
+    assert _ainvoke(router) == "secondary: hi"
+
+    assert router.stats == {"hedged": 0, "hedge_wins": 0, "fallbacks": 1}
+    assert router.providers[0].tracker.errors == 1
+
+
+def test_thread_backed_providers_are_not_hedged():
+    primary, secondary = FakeProvider("primary", 0.1), FakeProvider("secondary", 0.0)
+    router = _router(primary, secondary, native_async=False)
+
+    assert _ainvoke(router) == "primary: hi"
+
+    assert secondary.calls == 0 and not primary.cancelled
+    assert router.stats == {"hedged": 0, "hedge_wins": 0, "fallbacks": 0}
+
+
+def test_every_provider_failing_raises_router_error():
+    router = _router(FakeProvider("primary", 0.0, error=RuntimeError("503")),
+                     FakeProvider("secondary", 0.0, error=RuntimeError("429")))
+
+    with pytest.raises(RouterError) as excinfo:
+        _ainvoke(router)
+
+    assert [name for name, _ in excinfo.value.errors] == ["primary", "secondary"]
+
+
+def test_native_async_detection():
+    async def answer(prompt):
+        return prompt
+
+    # Chat models without their own _agenerate (like ChatPerplexity) run in a thread
+    assert not has_native_async(FakeListChatModel(responses=["x"]))
+    assert not has_native_async(RunnableLambda(lambda prompt: prompt))
+    assert has_native_async(RunnableLambda(lambda prompt: prompt, afunc=answer))
+    assert has_native_async(FakeProvider("fake", 0.0))